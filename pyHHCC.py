@@ -4,36 +4,833 @@
 # pylint: disable=C0103 # snake
 """ File, containing the pyHHCC class """
 
+import collections
+import concurrent.futures
 import glob
+import hashlib
+import itertools
+import json
 import os.path
 import logging
 import datetime as dt
+from time import perf_counter
 import numpy as np
 import pandas as pd
-import matplotlib.dates as mdates
+# matplotlib is imported by the plot functions on first use, so the data can be used without it:
 # from pandas.plotting import register_matplotlib_converters
-import matplotlib.pyplot as plt
 # register_matplotlib_converters()
 
 logger = logging.getLogger(__name__)
 
+class _CacheStore:
+    """ A versioned, columnar on-disk cache for the dataframes of :class:`pyHHCC`, stored in the folder `source + ".cache"`.
+    Every column is written as one .npy file (categoricals as codes, their categories go to the meta data)
+    and is memory mapped on reading. The cache is only valid for the source file, it was created from:
+    the size and the modification time are compared and, if only the modification time differs, the content hash.
+    Without source, e.g. for the history of :meth:`pyHHCC.update`, only the version is checked.
+
+    :param source: full path + filename of the export, the cache belongs to, or `None`.
+    :type source: `str`
+    :param path: optional, the folder of the cache, defaults to `source + ".cache"`.
+    :type path: `str`"""
+    version = 7
+
+    def __init__(self, source, path=None):
+        self.source = source
+        self.path = source + ".cache" if path is None else path
+
+    @staticmethod
+    def hash(filepath):
+        """ The sha1 hash of the content of the passed file."""
+        sha1 = hashlib.sha1()
+        with open(filepath, "rb") as fp:
+            for chunk in iter(lambda: fp.read(1 << 20), b""):
+                sha1.update(chunk)
+        return sha1.hexdigest()
+
+    def valid(self, meta):
+        """ Checks the meta data of the cache against the version and the source file.
+        If only the modification time differs, e.g. after a copy, the new one is set in `meta`, once the content hash matches."""
+        if meta.get("version") != self.version:
+            return False
+        if self.source is None or not os.path.exists(self.source):
+            return True
+        stat = os.stat(self.source)
+        if stat.st_size != meta["size"]:
+            return False
+        if stat.st_mtime_ns == meta["mtime_ns"]:
+            return True
+        if self.hash(self.source) != meta["sha1"]:
+            return False
+        meta["mtime_ns"] = stat.st_mtime_ns
+        return True
+
+    def __meta(self):
+        """ The meta data of the cache, or `None` if there is no valid cache."""
+        try:
+            with open(os.path.join(self.path, "meta.json")) as fp:
+                meta = json.load(fp)
+        except (OSError, ValueError):
+            return None
+        mtime = meta.get("mtime_ns")
+        if not self.valid(meta):
+            logger.info("cache is outdated: %s", self.path)
+            return None
+        if meta.get("mtime_ns") != mtime:
+            # the content is unchanged, the new modification time spares hashing it again:
+            try:
+                self.__write_meta(meta)
+            except OSError:
+                pass
+        return meta
+
+    def __write_meta(self, meta):
+        """ Replaces the meta data of the cache in one step, so it always describes complete files."""
+        tmp = os.path.join(self.path, "meta.json.tmp")
+        with open(tmp, "w") as fp:
+            json.dump(meta, fp)
+        os.replace(tmp, os.path.join(self.path, "meta.json"))
+
+    def load(self):
+        """ Returns a dict with the cached dataframes, or `None` if there is no valid cache."""
+        meta = self.__meta()
+        if meta is None:
+            return None
+        return {name: self.__load_frame(info) for (name, info) in meta["frames"].items()}
+
+    def add(self, **frames):
+        """ Writes the passed dataframes (or series) into the existing cache and replaces the cached ones of the same name, `None` removes one.
+        The other frames are kept as they are. Written files are never overwritten, as they may be memory mapped: the new frames get new files
+        and the files of the replaced ones are removed (if the system allows it).
+
+        :returns: `False`, if there is no valid cache to add to."""
+        meta = self.__meta()
+        if meta is None:
+            return False
+        meta["generation"] = meta.get("generation", 0) + 1
+        replaced = [meta["frames"].pop(name) for name in frames if name in meta["frames"]]
+        for (name, obj) in frames.items():
+            if obj is not None:
+                meta["frames"][name] = self.__save_frame(self.path, "%s.%d" % (name, meta["generation"]), obj)
+        self.__write_meta(meta)
+        for info in replaced:
+            for fileInfo in [colInfo for (_, colInfo) in info["columns"]] + info.get("index", []):
+                try:
+                    os.remove(os.path.join(self.path, fileInfo["file"]))
+                except OSError:
+                    pass
+        return True
+
+    def save(self, **frames):
+        """ Writes the passed dataframes (or series) to the cache, replacing the existing cache. As in :meth:`_CacheStore.add`,
+        the files of the existing cache are not overwritten: the frames get files of a new generation, the meta data are replaced
+        in one step and the old files are removed afterwards (if the system allows it, the next save removes them otherwise)."""
+        meta = {"version": self.version, "frames": {}}
+        if self.source is not None:
+            stat = os.stat(self.source)
+            meta.update({"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha1": self.hash(self.source)})
+        os.makedirs(self.path, exist_ok=True)
+        existing = set(os.listdir(self.path)) - {"meta.json"}
+        # the files are named "<frame>.<generation>.<column>.npy", a new generation never reuses a name:
+        meta["generation"] = max([int(part) for filename in existing for part in filename.split(".")[1:2] if part.isdigit()], default=0) + 1
+        for (name, obj) in frames.items():
+            meta["frames"][name] = self.__save_frame(self.path, "%s.%d" % (name, meta["generation"]), obj)
+        self.__write_meta(meta)
+        for filename in existing:
+            try:
+                os.remove(os.path.join(self.path, filename))
+            except OSError:
+                pass
+
+    @staticmethod
+    def __save_column(path, filename, values):
+        """ Writes one column and returns its meta data."""
+        info = {"file": filename}
+        if pd.api.types.is_object_dtype(values.dtype):
+            info["object"] = True
+            values = pd.Categorical(values)
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            info["categories"] = values.categories.tolist()
+            values = values.codes
+        np.save(os.path.join(path, filename), np.asarray(values))
+        return info
+
+    def __load_column(self, info):
+        values = np.load(os.path.join(self.path, info["file"]), mmap_mode="c")
+        if info.get("object", False):
+            return np.array(info["categories"], dtype=object)[values]
+        if "categories" in info:
+            return pd.Categorical.from_codes(values, info["categories"])
+        return values
+
+    def __save_frame(self, path, name, obj):
+        info = {"series": isinstance(obj, pd.Series)}
+        if info["series"]:
+            info["name"] = obj.name
+            obj = obj.to_frame(name="values")
+        info["columns_name"] = obj.columns.name
+        info["columns"] = [[col, self.__save_column(path, "%s.%d.npy" % (name, i), obj[col].array)]
+                           for (i, col) in enumerate(obj.columns)]
+        info["index_names"] = list(obj.index.names)
+        if isinstance(obj.index, pd.RangeIndex):
+            info["range"] = [obj.index.start, obj.index.stop, obj.index.step]
+            return info
+        info["index"] = [self.__save_column(path, "%s.index%d.npy" % (name, i), obj.index.get_level_values(i).array)
+                         for i in range(obj.index.nlevels)]
+        return info
+
+    def __load_frame(self, info):
+        df = pd.DataFrame({col: self.__load_column(col_info) for (col, col_info) in info["columns"]}, copy=False)
+        if "range" in info:
+            df.index = pd.RangeIndex(*info["range"], name=info["index_names"][0])
+        else:
+            df.index = pd.MultiIndex.from_arrays([self.__load_column(i) for i in info["index"]], names=info["index_names"]) \
+            if len(info["index"]) > 1 else pd.Index(self.__load_column(info["index"][0]), name=info["index_names"][0])
+        df.columns.name = info["columns_name"]
+        if info["series"]:
+            return df["values"].rename(info["name"])
+        return df
+
+class _LRUCache:
+    """ A least recently used cache for dataframes, bounded by the memory the cached dataframes take.
+    If a new entry exceeds the limit, the least recently used entries are evicted (the newest one is always kept).
+
+    :param maxBytes: the memory limit in bytes.
+    :type maxBytes: `int`"""
+    def __init__(self, maxBytes):
+        self.maxBytes = maxBytes
+        self.nbytes = 0
+        self.__entries = collections.OrderedDict()
+
+    def __contains__(self, key):
+        return key in self.__entries
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def keys(self):
+        """ The keys, from the least to the most recently used."""
+        return list(self.__entries.keys())
+
+    def items(self):
+        """ The keys and the dataframes, from the least to the most recently used, without changing the order of use."""
+        return [(key, df) for (key, (df, _)) in self.__entries.items()]
+
+    def usage(self):
+        """ The rows and the memory in bytes per key, without changing the order of use."""
+        return {key: (len(df), size) for (key, (df, size)) in self.__entries.items()}
+
+    def get(self, key):
+        """ Returns the cached dataframe or `None`."""
+        if key not in self.__entries:
+            return None
+        self.__entries.move_to_end(key)
+        return self.__entries[key][0]
+
+    def put(self, key, df, size=None):
+        """ Adds or replaces an entry and evicts the least recently used entries, as long as the limit is exceeded.
+        The memory of the dataframe is measured, unless its `size` in bytes is passed, e.g. for other objects than dataframes."""
+        self.pop(key)
+        size = int(df.memory_usage(index=True, deep=True).sum()) if size is None else size
+        self.__entries[key] = (df, size)
+        self.nbytes += size
+        while self.nbytes > self.maxBytes and len(self.__entries) > 1:
+            _, (_, evicted) = self.__entries.popitem(last=False)
+            self.nbytes -= evicted
+
+    def pop(self, key):
+        """ Removes an entry, if it exists."""
+        if key in self.__entries:
+            self.nbytes -= self.__entries.pop(key)[1]
+
+    def clear(self):
+        """ Removes all entries."""
+        self.__entries.clear()
+        self.nbytes = 0
+
+def _figsize(**kwargs):
+    """ The size of the figure of :meth:`pyHHCC.plot_onePlant`."""
+    return [10, 3] if kwargs.get('landscape', False) else [10, 6]
+
+def _save_figure(fig, name, **kwargs):
+    """ Stores `fig`, see :meth:`pyHHCC.plot_save` for the parameters."""
+    if kwargs.get('store', False):
+        name = kwargs.get('override_name', name) 
+        outputdir = kwargs.get('outputdir', "plots/") 
+        dpi = kwargs.get('dpi', 300) 
+        fig.savefig(outputdir + name, dpi=dpi)
+
+def _pixel_columns(ax, **kwargs):
+    """ The width of `ax` in pixels, at the dpi of the figure or, if the plot is stored, at the dpi of the file, whichever is larger."""
+    dpi = max(ax.figure.dpi, kwargs.get('dpi', 300) if kwargs.get('store', False) else 0)
+    return max(1, int(np.ceil(ax.get_position().width * ax.figure.get_figwidth() * dpi)))
+
+def _envelope(time, values, xlim, columns):
+    """ Decimates a time series to its min/max envelope per pixel column: of the points within each of the `columns` buckets
+    of the time span `xlim`, only the first, the last, the minimum and the maximum are kept. The drawn line covers
+    the same pixels and all extremes stay visible, with at most 4 points per column.
+
+    :returns: the kept times and values."""
+    if len(values) <= 4*columns:
+        return (time, values)
+    (first, last) = (pd.Timestamp(x).value for x in xlim)
+    bucket = np.clip((time.astype("datetime64[ns]").view(np.int64) - first) * columns // max(last - first, 1), 0, columns - 1)
+    # the times are sorted, so each bucket is a run of points:
+    starts = np.flatnonzero(np.concatenate([[True], bucket[1:] != bucket[:-1]]))
+    ends = np.concatenate([starts[1:], [len(values)]]) - 1
+    byMin = np.lexsort((np.where(np.isnan(values), np.inf, values), bucket))
+    byMax = np.lexsort((np.where(np.isnan(values), -np.inf, -values), bucket))
+    keep = np.unique(np.concatenate([starts, ends, byMin[starts], byMax[starts]]))
+    return (time[keep], values[keep])
+
+def _draw_panel(ax, panel, **kwargs):
+    """ Draws one parameter of one plant, as collected by :meth:`pyHHCC.plot_onePlant_oneParam`, to `ax`.
+    With `downsample`, the data are decimated to their min/max envelope per pixel column of `ax` (see :func:`_envelope`)."""
+    import matplotlib.dates as mdates
+    (time, values) = (panel["time"], panel["values"])
+    if kwargs.get('downsample', False):
+        (time, values) = _envelope(time, values, panel["xlim"], _pixel_columns(ax, **kwargs))
+    ax.plot(time, values, color=panel["color"], alpha=kwargs.get('alphaOriginal', 1))
+    ax.set_xlim(*panel["xlim"])
+    if panel["ylim"] is not None:
+        ax.set_ylim(*panel["ylim"])
+
+    ax.set_xlabel("")
+    ax.set_ylabel(panel["label"])
+
+    years = mdates.YearLocator()   # every year
+    months = mdates.MonthLocator()  # every month
+    days = mdates.DayLocator()  # every month
+    hours = mdates.HourLocator()  # every month
+    years_fmt = mdates.DateFormatter('%Y')
+    months_fmt = mdates.DateFormatter('%Y-%m')
+    days_fmt = mdates.DateFormatter('%Y-%m-%d')
+
+    time_labels = kwargs.get('time_labels', 'month')
+    if time_labels == "year":
+        ax.xaxis.set_major_locator(years)
+        ax.xaxis.set_major_formatter(years_fmt)
+        ax.xaxis.set_minor_locator(months)
+        ax.format_xdata = mdates.DateFormatter('%Y-%m-%d')
+    elif time_labels == "month":
+        ax.xaxis.set_major_locator(months)
+        ax.xaxis.set_major_formatter(months_fmt)
+        ax.xaxis.set_minor_locator(days)
+        ax.format_xdata = mdates.DateFormatter('%Y-%m-%d')
+    elif time_labels == "day":
+        ax.xaxis.set_major_locator(days)
+        ax.xaxis.set_major_formatter(days_fmt)
+        ax.xaxis.set_minor_locator(hours)
+        ax.format_xdata = mdates.DateFormatter('%Y-%m-%d')
+    else:
+        logger.error("unknown parameter for 'time_labels' ")
+    
+    if kwargs.get('hide_xTicks', False) | kwargs.get('hide_ticks', False):
+        ax.get_xaxis().set_ticks([])
+        ax.get_xaxis().set_ticklabels([])
+    if kwargs.get('hide_yTicks', False) | kwargs.get('hide_ticks', False):
+        ax.set_ylabel("")
+        ax.get_yaxis().set_ticks([])
+        ax.get_yaxis().set_ticklabels([])
+
+def _onePlant_axes(fig, **kwargs):
+    """ The four axes of :meth:`pyHHCC.plot_onePlant` on `fig`, for the parameters E, S, L and T."""
+    if kwargs.get('landscape', False):
+        ax1 = fig.add_subplot(141)
+        ax2 = fig.add_subplot(142, sharex=ax1)
+        ax3 = fig.add_subplot(143, sharex=ax1)
+        ax4 = fig.add_subplot(144, sharex=ax1)
+    else:
+        ax1 = fig.add_subplot(221)
+        ax2 = fig.add_subplot(222, sharex=ax1)
+        ax3 = fig.add_subplot(223, sharex=ax1)
+        ax4 = fig.add_subplot(224, sharex=ax1)
+    return [ax1, ax2, ax3, ax4]
+
+def _finish_onePlant(fig, plant):
+    """ Lays out the drawn axes of :meth:`pyHHCC.plot_onePlant`."""
+    fig.autofmt_xdate()
+    fig.align_ylabels()
+    fig.tight_layout(rect=[0, 0.03, 1, 0.95])
+    fig.suptitle(plant, fontsize=14)
+
+def _draw_onePlant(fig, plant, panels, **kwargs):
+    """ Draws the four panels of :meth:`pyHHCC.plot_onePlant` to `fig`."""
+    for (ax, panel) in zip(_onePlant_axes(fig, **kwargs), panels):
+        _draw_panel(ax, panel, **kwargs)
+    _finish_onePlant(fig, plant)
+
+def _overview_size(plants, **kwargs):
+    """ The size of the figure of :meth:`pyHHCC.plot_allPlants` for the number of `plants`."""
+    return (10, plants) if kwargs.get('landscape', True) else (10, 2.5*plants)
+
+def _overview_cells(plants, **kwargs):
+    """ The cells of the grid of :meth:`pyHHCC.plot_allPlants`, in the order they are drawn.
+
+    :returns: a list of (row, column, plant, param, kwargs), with the passed kwargs refined per axis."""
+    cells = []
+    landscape = kwargs.get('landscape', True)
+    for (i, plant) in enumerate(plants):
+        for (j, param) in enumerate(["E", "S", "L", "T"]):
+            if not landscape:
+                cells.append((i, j, plant, param, dict(kwargs, hide_yTicks=True)))
+            elif param == "T":
+                cells.append((j, i, plant, param, dict(kwargs, hide_xTicks=False, hide_yTicks=bool(i), label_short=True)))
+            else:
+                cells.append((j, i, plant, param, dict(kwargs, hide_ticks=bool(i), label_short=True)))
+    return cells
+
+def _overview_axes(fig, plants, labels, **kwargs):
+    """ Creates the grid of axes of :meth:`pyHHCC.plot_allPlants` on `fig`, see :func:`_overview_cells`.
+
+    :param labels: The long label per parameter, for the titles of the columns, if not `landscape`.
+    :type labels: `dict`
+    :returns: a list of (ax, plant, param, kwargs), with the passed kwargs refined per axis."""
+    landscape = kwargs.get('landscape', True)
+    shape = (4, len(plants)) if landscape else (len(plants), 4)
+    axs = fig.subplots(*shape, sharex=True, squeeze=False)
+    grid = []
+    for (row, column, plant, param, axKwargs) in _overview_cells(plants, **kwargs):
+        if row == 0:
+            axs[row, column].title.set_text(plant if landscape else labels[param])
+        grid.append((axs[row, column], plant, param, axKwargs))
+    return grid
+
+def _finish_overview(fig, grid, **kwargs):
+    """ Labels and lays out the drawn `grid` of :meth:`pyHHCC.plot_allPlants`, see :func:`_overview_axes`."""
+    if not kwargs.get('landscape', True):
+        for (ax, plant, param, _) in grid:
+            if param == "E":
+                ax.set_ylabel(plant)
+    fig.autofmt_xdate()
+    fig.tight_layout(rect=[0, 0, 1, 1])
+    fig.subplots_adjust(hspace=.001)
+    fig.subplots_adjust(wspace=.001)
+
+def _render_onePlant(plant, panels, kwargs):
+    """ Draws and stores the plot of one plant on a figure of its own, without pyplot. Runs in the worker processes of :meth:`pyHHCC.plot_onePlant_batch`."""
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=_figsize(**kwargs))
+    _draw_onePlant(fig, plant, panels, **kwargs)
+    _save_figure(fig, "Health of " + plant, **kwargs)
+
+class Renderer:
+    """ A persistent plot of :meth:`pyHHCC.plot_allPlants` or, for one plant, of :meth:`pyHHCC.plot_onePlant`, see :meth:`pyHHCC.renderer`.
+    The figure, its axes, locators and layout are built once. :meth:`Renderer.refresh` swaps the data of the lines
+    and only redraws the whole figure if the limits of an axis changed, e.g. on a new day or a new maximum.
+
+    :param collect: Returns the panel (see :func:`_draw_panel`) of a plant and a parameter, called with the kwargs of the axis.
+    :type collect: `callable`
+    :param plants: The plants of the overview.
+    :type plants: `list`
+    :param labels: The long label per parameter.
+    :type labels: `dict`
+    :param plant: The plant to plot alone, as :meth:`pyHHCC.plot_onePlant`. Defaults to `None`, for the overview of all `plants`.
+    :type plant: `str`, optional
+    :param blit: `True` to keep the rendered axes without their lines as background and only draw the lines on top on a refresh. Defaults to `False`.
+    :type blit: `bool`, optional
+
+    All further kwargs are passed to the plot functions, see :meth:`pyHHCC.plot_onePlant_oneParam`.
+    If the plot is stored, the figure is rendered at the dpi of the file, so :meth:`Renderer.save` can write the rendered canvas."""
+
+    def __init__(self, collect, plants, labels, plant=None, blit=False, **kwargs):
+        import matplotlib.pyplot as plt
+        self.__collect = collect
+        self.kwargs = kwargs
+        dpi = kwargs.get('dpi', 300) if kwargs.get('store', False) else None
+        if plant is None:
+            self.name = "Overview"
+            self.figure = plt.figure(figsize=_overview_size(len(plants), **kwargs), dpi=dpi)
+            self.grid = _overview_axes(self.figure, plants, labels, **kwargs)
+        else:
+            self.name = "Health of " + plant
+            self.figure = plt.figure(figsize=_figsize(**kwargs), dpi=dpi)
+            self.grid = [(ax, plant, param, kwargs) for (ax, param) in zip(_onePlant_axes(self.figure, **kwargs), ["E", "S", "L", "T"])]
+        self.blit = blit and getattr(self.figure.canvas, "supports_blit", False)
+        if blit and not self.blit:
+            logger.warning("the canvas does not support blitting, redrawing the whole figure on refresh")
+        self.panels = []
+        self.lines = []
+        for (ax, plant_, param, axKwargs) in self.grid:
+            panel = self.__collect(plant_, param, **axKwargs)
+            _draw_panel(ax, panel, **axKwargs)
+            self.panels.append(panel)
+            self.lines.append(ax.get_lines()[-1])
+        if plant is None:
+            _finish_overview(self.figure, self.grid, **kwargs)
+        else:
+            _finish_onePlant(self.figure, plant)
+        self.__backgrounds = None
+        self.__draw()
+
+    def refresh(self):
+        """ Collects the current data and swaps them into the lines. The limits of the axes are adjusted,
+        which requires to redraw the whole figure. Otherwise, only the lines are drawn (with `blit`) or the figure is redrawn."""
+        stale = False
+        for (i, (ax, plant, param, axKwargs)) in enumerate(self.grid):
+            panel = self.__collect(plant, param, **axKwargs)
+            (time, values) = (panel["time"], panel["values"])
+            if axKwargs.get('downsample', False):
+                (time, values) = _envelope(time, values, panel["xlim"], _pixel_columns(ax, **axKwargs))
+            self.lines[i].set_data(time, values)
+            if panel["xlim"] != self.panels[i]["xlim"]:
+                ax.set_xlim(*panel["xlim"])
+                stale = True
+            if panel["ylim"] is None:
+                ylim = ax.get_ylim()
+                ax.relim()
+                ax.autoscale_view(scalex=False)
+                stale |= ax.get_ylim() != ylim
+            elif panel["ylim"] != self.panels[i]["ylim"]:
+                ax.set_ylim(*panel["ylim"])
+                stale = True
+            self.panels[i] = panel
+        if stale or not self.blit:
+            self.__draw()
+        else:
+            self.__draw_lines()
+
+    def __draw(self):
+        """ Redraws the whole figure. With `blit`, the lines are animated: the figure is drawn without them,
+        kept as background per axis and the lines are drawn on top."""
+        canvas = self.figure.canvas
+        if not self.blit:
+            canvas.draw()
+            return
+        for line in self.lines:
+            line.set_animated(True)
+        canvas.draw()
+        self.__backgrounds = [canvas.copy_from_bbox(ax.bbox) for (ax, _, _, _) in self.grid]
+        self.__draw_lines()
+
+    def __draw_lines(self):
+        """ Restores the background of each axis and draws its line on top."""
+        canvas = self.figure.canvas
+        for ((ax, _, _, _), line, background) in zip(self.grid, self.lines, self.__backgrounds):
+            canvas.restore_region(background)
+            ax.draw_artist(line)
+            canvas.blit(ax.bbox)
+
+    def save(self, name=None, **kwargs):
+        """ Stores the plot, see :meth:`pyHHCC.plot_save` for the parameters, which default to the ones of the renderer.
+        A png at the dpi of the figure is written from the rendered canvas, without drawing the figure again.
+
+        :param name: Defaults to "Overview" or "Health of " + plant."""
+        import matplotlib.pyplot as plt
+        kwargs = dict(self.kwargs, **kwargs)
+        if not kwargs.get('store', False):
+            return
+        path = kwargs.get('outputdir', "plots/") + kwargs.get('override_name', self.name if name is None else name)
+        dpi = kwargs.get('dpi', 300)
+        ext = os.path.splitext(path)[1].lower()
+        if not ext and plt.rcParams["savefig.format"] == "png":
+            (path, ext) = (path + ".png", ".png")
+        if ext == ".png" and dpi == self.figure.dpi and hasattr(self.figure.canvas, "buffer_rgba"):
+            plt.imsave(path, np.asarray(self.figure.canvas.buffer_rgba()), dpi=dpi)
+            return
+        for line in self.lines:
+            line.set_animated(False)
+        self.figure.savefig(path, dpi=dpi)
+        for line in self.lines:
+            line.set_animated(self.blit)
+
+    def close(self):
+        """ Closes the figure."""
+        import matplotlib.pyplot as plt
+        plt.close(self.figure)
+
+_EPOCH = np.datetime64("1970-01-01T00", "h")
+_RESOLUTION = {"E": 1000, "L": 1000, "S": 1, "T": 10}
+_MISSING = np.iinfo(np.int16).min
+_CALENDAR_AGGREGATES = ("sum", "min", "max", "mean", "count", "std")
+
+def _encode(df):
+    """ Encodes hourly data (the columns time, E, L, S, T, plant and mac) compactly, as held by :class:`pyHHCC`:
+    the time as int32 hours since 1970 and each parameter as int16 in steps of its sensor resolution
+    (1/1000 for E and L, 1 for S and 1/10 for T), with -32768 for missing values. A parameter with values
+    that do not fit this resolution or the range of int16 is kept as float32. See :func:`_decode`."""
+    keys = _encode_hours(df)
+    out = {"hour": keys["hour"].to_numpy()}
+    for param in ["E", "L", "S", "T"]:
+        out[param] = _encode_values(df[param].to_numpy(dtype=np.float32), _RESOLUTION[param])
+    out["plant"] = keys["plant"].array
+    out["mac"] = keys["mac"].array
+    return pd.DataFrame(out)
+
+def _encode_hours(df):
+    """ Encodes the columns time, plant and mac of `df` as :func:`_encode` does, without the parameters, e.g. for the hours of sensor failures."""
+    hours = df["time"].to_numpy().astype("datetime64[h]")
+    if np.any(hours != df["time"].to_numpy()):
+        raise ValueError("the hourly data must be on the full hour")
+    return pd.DataFrame({"hour": (hours - _EPOCH).astype(np.int32),
+                         "plant": df["plant"].astype("category").array,
+                         "mac": df["mac"].astype("category").array})
+
+def _encode_values(values, resolution):
+    """ The int16 steps of `resolution` of the float32 `values`, or the values, if they do not fit."""
+    missing = np.isnan(values)
+    steps = np.round(np.where(missing, 0, values).astype(np.float64)*resolution)
+    if np.any(steps <= _MISSING) or np.any(steps > np.iinfo(np.int16).max):
+        return values
+    steps = np.where(missing, _MISSING, steps).astype(np.int16)
+    if not np.array_equal(_decode_values(steps, resolution), values, equal_nan=True):
+        return values
+    return steps
+
+def _decode_values(values, resolution):
+    """ The float32 values of the int16 steps of `resolution`, see :func:`_encode_values`."""
+    if values.dtype != np.int16:
+        return values
+    out = values.astype(np.float32) / np.float32(resolution)
+    out[values == _MISSING] = np.nan
+    return out
+
+def _decode(hourly):
+    """ Returns the hourly data, encoded by :func:`_encode`, as dataframe with the columns time, E, L, S, T, plant and mac
+    (datetime64 and float32), keeping the index."""
+    df = pd.DataFrame({"time": (_EPOCH + hourly["hour"].to_numpy()).astype("datetime64[ns]")}, index=hourly.index)
+    for param in ["E", "L", "S", "T"]:
+        df[param] = _decode_values(hourly[param].to_numpy(), _RESOLUTION[param])
+    df["plant"] = hourly["plant"]
+    df["mac"] = hourly["mac"]
+    df.columns.name = "parameter"
+    return df
+
+def _shared_categories(frames):
+    """ Returns the passed dataframes with the categories of plant and mac united, so they are concatenated as categoricals
+    without recoding them from the strings."""
+    dtypes = {}
+    for col in ["plant", "mac"]:
+        categories = frames[0][col].cat.categories
+        for df in frames[1:]:
+            categories = categories.union(df[col].cat.categories)
+        dtypes[col] = pd.CategoricalDtype(categories)
+    out = []
+    for df in frames:
+        recoded = {}
+        for (col, dtype) in dtypes.items():
+            # the codes are mapped to the united categories, the strings are not compared per row:
+            codes = df[col].cat.codes.to_numpy()
+            mapping = np.append(dtype.categories.get_indexer(df[col].cat.categories), -1)
+            recoded[col] = pd.Categorical.from_codes(mapping[codes], dtype=dtype)
+        out.append(df.assign(**recoded))
+    return out
+
+def _concat_encoded(frames):
+    """ Concatenates dataframes, encoded by :func:`_encode`. As each of them is encoded on its own, a parameter can be held
+    as int16 steps in one and as float32 in another (see :func:`_encode_values`). Such a parameter is decoded to float32 in all of them,
+    before pandas would cast the steps to float without scaling them."""
+    frames = _shared_categories(frames)
+    for param in ["E", "L", "S", "T"]:
+        if len({df[param].dtype for df in frames}) > 1:
+            frames = [df.assign(**{param: _decode_values(df[param].to_numpy(), _RESOLUTION[param])}) for df in frames]
+    return pd.concat(frames, ignore_index=True, sort=False)
+
+def _known_plants(known, new):
+    """ Returns the encoded frame `new` (see :func:`_encode`) with the plant of each known sensor set to the plant of its latest hour in the
+    encoded hourly data `known`, e.g. after :meth:`pyHHCC.rename_plants` or after renaming the plant in the app. Other sensors keep their plant."""
+    if known.empty or new.empty:
+        return new
+    latest = known.loc[known.groupby("mac", observed=True)["hour"].idxmax(), ["mac", "plant"]]
+    plants = pd.Series(latest["plant"].astype(object).to_numpy(), index=latest["mac"].astype(object).to_numpy())
+    byMac = plants.reindex(new["mac"].cat.categories).to_numpy()[new["mac"].cat.codes.to_numpy()]
+    return new.assign(plant=pd.Categorical(np.where(pd.isna(byMac), new["plant"].astype(object).to_numpy(), byMac)))
+
+def _extrema(df, params=("E", "L", "S", "T")):
+    """ The min and the max values of the passed parameters, as arrays, NaN if there are none."""
+    return (df[list(params)].min().to_numpy(), df[list(params)].max().to_numpy())
+
+def _frame_size(frames):
+    """ The rows and the memory in bytes of the passed dataframes, `None` if there are none."""
+    if not frames:
+        return (None, None)
+    return (sum(len(df) for df in frames), int(sum(df.memory_usage(index=True, deep=True).sum() for df in frames)))
+
+def _is_converted(filepath):
+    """ `True` for a .csv file, written by :meth:`pyHHCC.convert`, which starts with the header "time,", `False` for an export of the app."""
+    with open(filepath, "rb") as fp:
+        return fp.read(5) == b"time,"
+
+def _read_compact(filepath, stage=None):
+    """ Returns the cleaned hourly data of one export, encoded by :func:`_encode`, and the hours of its sensor failures
+    as dict with the keys "hourly" and "failed". The export is read by :meth:`pyHHCC.iter_blocks` and each sensor block is encoded on its own,
+    so only the raw data of one block are held at a time, besides the compact table. A .csv file, written by :meth:`pyHHCC.convert`,
+    is read in chunks of rows instead, it has no sensor failures.
+
+    :param stage: optional, runs each step as `stage(name, func, *args)`, see :meth:`pyHHCC.__stage`."""
+    stage = (lambda name, func, *args: func(*args)) if stage is None else stage
+    (hourly, failed) = ([], [])
+    if _is_converted(filepath):
+        for df in pd.read_csv(filepath, parse_dates=["time"], chunksize=2**16):
+            hourly.append(stage("encode", _encode, df))
+        failed = [df[["hour", "plant", "mac"]].iloc[:0] for df in hourly[:1]]
+    else:
+        for (df, fails) in pyHHCC.iter_blocks(filepath, failures=True, stage=stage):
+            hourly.append(stage("encode", _encode, df))
+            failed.append(fails)
+    if not hourly:
+        raise ValueError("no data found in: %s" % filepath)
+    return {"hourly": stage("concat", _concat_encoded, hourly),
+            "failed": pd.concat(_shared_categories(failed), ignore_index=True, sort=False)}
+
+def _history_path(filename):
+    """ The folder of the history of a dataset (see :meth:`pyHHCC.update`): "pyHHCC.history" in the folder of the export,
+    of the exports for a directory, or of the most recent export for a list of exports."""
+    if isinstance(filename, list):
+        filename = filename[-1]
+    folder = filename if os.path.isdir(filename) else os.path.dirname(filename)
+    return os.path.join(folder, "pyHHCC.history")
+
+def _read_export(filepath, ignorePickled=False):
+    """ Returns the cleaned hourly data of one export (see :meth:`pyHHCC.read`), encoded by :func:`_encode`, and the hours of its sensor failures
+    as dict with the keys "hourly" and "failed", from its cache, as long as the file did not change.
+    Otherwise, the file is parsed and the cache is written. Runs in the worker processes of :meth:`pyHHCC.__ingest`."""
+    cache = _CacheStore(filepath)
+    if not ignorePickled:
+        try:
+            frames = cache.load()
+            if frames is not None:
+                logger.info("loading cached version of: %s", filepath)
+                return frames
+        except Exception as ex:
+            logger.warning("loading the cache failed, attemting to read .csv file:")
+            if logger.level == logging.DEBUG:
+                raise ex
+    logger.info("loading: %s", filepath)
+    frames = _read_compact(filepath)
+    cache.save(**frames)
+    return frames
+
+class HourlyGrid:
+    """ The hourly data of several sensors on a regular grid of whole days, see :meth:`pyHHCC.grid`: one row per sensor (plant and mac),
+    one column per hour and one layer per parameter, with an explicit mask of the hours with data. Aggregations over time
+    and comparisons between the sensors become array operations, e.g. ``grid.values[:, :, grid.params.index("T")]`` for the temperatures of all sensors.
+
+    :ivar sensors: the plant and the mac of each sensor, as dataframe.
+    :ivar time: the hours of the grid (datetime64[h]), from midnight of the first day till 23:00 of the last day.
+    :ivar params: the parameters, in the order of the last axis.
+    :ivar values: the values (float32), sensor x hour x parameter, NaN where there are no data.
+    :ivar valid: `True` where there are data, of the same shape as `values`."""
+    def __init__(self, sensors, time, params, values):
+        self.sensors = sensors
+        self.time = time
+        self.params = list(params)
+        self.values = values
+        self.valid = ~np.isnan(values)
+
+    def rolling_mean(self, wnd):
+        """ The mean of the valid values over the window `wnd` (processed by `pd.to_timedelta`, whole hours) up to each hour,
+        as `pd.DataFrame.rolling(wnd).mean()` takes it for the hours with data, computed by differences of cumulated sums.
+
+        :returns: an array of the shape of `values`, NaN where the window does not contain any valid value."""
+        length = int(pd.to_timedelta(wnd) / pd.to_timedelta("1h"))
+        sums = np.zeros((self.values.shape[0], self.values.shape[1] + 1, self.values.shape[2]))
+        sums[:, 1:] = np.cumsum(np.where(self.valid, self.values, 0), axis=1, dtype=np.float64)
+        counts = np.zeros(sums.shape, dtype=np.int64)
+        counts[:, 1:] = np.cumsum(self.valid, axis=1)
+        start = np.maximum(np.arange(1, self.values.shape[1] + 1) - length, 0)
+        with np.errstate(invalid="ignore"):
+            # 0/0 gives NaN for windows without any valid value
+            return (sums[:, 1:] - sums[:, start]) / (counts[:, 1:] - counts[:, start])
+
+    def daily(self, aggFunc="sum"):
+        """ Aggregates the valid values per day, e.g. the daily light integral with "sum", as one reshape of the grid.
+
+        :param aggFunc: "sum", "mean", "min", "max" or "count".
+        :type aggFunc: `str`, optional
+        :returns: the days (datetime64[D]) and an array sensor x day x parameter, NaN for days without valid values (except for "count")."""
+        shape = (self.values.shape[0], -1, 24, self.values.shape[2])
+        (values, valid) = (self.values.reshape(shape), self.valid.reshape(shape))
+        count = valid.sum(axis=2)
+        if aggFunc == "count":
+            out = count
+        elif aggFunc in ["sum", "mean"]:
+            out = np.where(valid, values, 0).sum(axis=2, dtype=np.float64)
+            with np.errstate(invalid="ignore"):
+                out = np.where(count > 0, out if aggFunc == "sum" else out / count, np.nan)
+        elif aggFunc in ["min", "max"]:
+            fill = np.inf if aggFunc == "min" else -np.inf
+            out = getattr(np.where(valid, values, fill), aggFunc)(axis=2)
+            out = np.where(count > 0, out, np.nan)
+        else:
+            raise ValueError("unknown aggregation: %s" % aggFunc)
+        return (self.time[::24].astype("datetime64[D]"), out)
+
+    def gaps(self):
+        """ The statistics of the gaps per sensor, between its first and its last hour with data. An hour counts as data, if any parameter is valid.
+
+        :returns: a dataframe with one row per sensor and the columns plant, mac, first, last, hours (from the first to the last hour with data),
+            valid (the hours with data), coverage (valid / hours), gaps (the number of gaps) and longest_gap (in hours)."""
+        hasData = self.valid.any(axis=2)
+        position = np.arange(hasData.shape[1])
+        first = np.where(hasData.any(axis=1), np.argmax(hasData, axis=1), 0)
+        last = np.where(hasData.any(axis=1), hasData.shape[1] - 1 - np.argmax(hasData[:, ::-1], axis=1), -1)
+        inside = (position >= first[:, None]) & (position <= last[:, None])
+        missing = inside & ~hasData
+        # a gap starts at a missing hour after an hour with data:
+        starts = missing[:, 1:] & ~missing[:, :-1]
+        # the length of each gap, as the distance to the next hour with data:
+        nextData = np.minimum.accumulate(np.where(hasData, position, hasData.shape[1])[:, ::-1], axis=1)[:, ::-1]
+        lengths = np.where(starts, nextData[:, 1:] - position[1:], 0)
+        out = self.sensors.copy()
+        out["first"] = np.where(last >= 0, self.time[first], np.datetime64("NaT")).astype("datetime64[ns]")
+        out["last"] = np.where(last >= 0, self.time[np.maximum(last, 0)], np.datetime64("NaT")).astype("datetime64[ns]")
+        out["hours"] = np.maximum(last - first + 1, 0)
+        out["valid"] = hasData.sum(axis=1)
+        with np.errstate(invalid="ignore"):
+            out["coverage"] = out["valid"] / out["hours"]
+        out["gaps"] = starts.sum(axis=1)
+        out["longest_gap"] = lengths.max(axis=1, initial=0)
+        return out
+
 class pyHHCC:
     """ Can generate various overview plots for the plant and parameters provided from the export of the FlowerCare app by Xiaomi/HHCC.
     
     :param filename: Either directly a filename (without file extention) or a directory,
                          where the csv files are located. In case of a folder,
                          the csv file with the most recent "date modified" is used.
-                         On second loading, a pickeld version of the data is loaded.
-    :param ignorePickled: By defualt, the pkl files are used, set to True, to do reparse the .csv files.
-    :type filename: `str`
+                         On second loading, the cleaned data are loaded from the folder `filename + ".cache"`,
+                         as long as the file did not change since.
+                         A .csv file, written by :meth:`pyHHCC.convert`, is loaded as well.
+                         A list of filenames is parsed and merged into one dataset, see :meth:`pyHHCC.__ingest`.
+    :param ignorePickled: By defualt, the cache is used, set to True, to do reparse the .csv files.
+    :param cacheSize: The memory limit in bytes for the derived data (rolling means and daily aggregates), defaults to 256 MB.
+        These data are computed on first use, per plant, and the least recently used ones are dropped when the limit is reached.
+    :param mergeFiles: `True` to merge all .csv files of the directory `filename` instead of using the most recent one only,
+        e.g. for exports from several phones. Defaults to `False`.
+    :param workers: The number of processes to parse several files, `None` for one per CPU. Defaults to 1, to parse in this process.
+    :param instrument: `True` to record the wall time, the rows and the memory of each stage of the pipeline
+        (parsing, cleaning, caching, derived data, plotting) in :attr:`pyHHCC.stages`, see :meth:`pyHHCC.stage_report`.
+        Each record is also logged on DEBUG level. Defaults to `False`.
+    :param onStage: optional, a function that is called with each record, e.g. to collect them elsewhere. Implies `instrument`.
+    :param history: By default, the history of the dataset, kept by :meth:`pyHHCC.update`, is loaded and the export is merged into it.
+        Set to False, to neither load nor write the history.
+    :type filename: `str` or `list`
     :type ignorePickled: `bool`
+    :type cacheSize: `int`, optional
+    :type mergeFiles: `bool`, optional
+    :type workers: `int`, optional
+    :type instrument: `bool`, optional
+    :type onStage: `callable`, optional
+    :type history: `bool`, optional
     :ivar list_of_plants: a list with the names of all plants
     :ivar minMax: For plotting we need to know the global min and max values per plotted value and per aggregation.
         ["daily","L","sum","amax"] gives you the maximum values that will ever be plotted for plots that
-        show daily data for the sum of light.
+        show daily data for the sum of light. The entries are added, once an aggregation is plotted for the first time.
+        They are reduced from an index of the min and max values per plant and aggregation, which is kept up to date
+        as derived data are computed and new data are merged.
     :ivar param: A dict for each parameter (E, L, S, T) to define 'color' for the plots and 'label' for the data.
-    :ivar df: the actual pandas dataframe, containing the data."""
-    def __init__(self, filename, ignorePickled=False):
+    :ivar healthRules: The rules of :meth:`pyHHCC.health`, by default: no data for 15 days, the soil humidity below 15 % for 48 hours
+        and more than 10 % sensor failures within the last 7 days.
+    :ivar df: the actual pandas dataframe, containing the hourly data, sorted by plant and time.
+        It is decoded on each access from the compact storage, see :meth:`pyHHCC.memory_usage`.
+    :ivar stages: With `instrument`, one dict per executed stage, see :meth:`pyHHCC.stage_report`.
+    :ivar version: The version of the data, counted up whenever they change by :meth:`pyHHCC.update` or :meth:`pyHHCC.rename_plants`,
+        e.g. to invalidate plots that were rendered from older data."""
+    def __init__(self, filename, ignorePickled=False, cacheSize=256*2**20, mergeFiles=False, workers=1, instrument=False, onStage=None, history=True):
+        self.stages = []
+        self.__instrument = instrument or onStage is not None
+        self.__onStage = onStage
         self.param = {"E": {'color':"g",
                             'label':"nutrition (ms/cm)",
                             'label_short':"nutr"},
@@ -46,103 +843,407 @@ class pyHHCC:
                       "T": {'color':"r",
                             'label':"temperature (°)",
                             'label_short':"temp"}}
-        if os.path.isdir(filename):
+        self.healthRules = [{"name": "no update", "kind": "stale", "duration": "15 days"},
+                            {"name": "dry soil", "kind": "threshold", "param": "S", "below": 15, "duration": "48h"},
+                            {"name": "sensor failures", "kind": "failures", "above": 0.1, "duration": "7 days"}]
+        self.__history = _CacheStore(None, _history_path(filename)) if history else None
+        if isinstance(filename, str) and os.path.isdir(filename) and mergeFiles:
+            logger.info("merging all .csv files from folder: %s", filename)
+            filename = sorted(glob.glob(filename+'*.csv'), key=os.path.getmtime)
+        elif isinstance(filename, str) and os.path.isdir(filename):
             logger.info("finding .csv with latest creation date from folder: %s", filename)
             list_of_files = glob.glob(filename+'*.csv') # * means all if need specific format then *.csv
             filename = max(list_of_files, key=os.path.getmtime)
 
-        self.df = None
-        if os.path.exists(filename+".pkl") & (not ignorePickled):
-            logger.info("loading pkl version of: %s", filename)
+        cache = _CacheStore(filename) if isinstance(filename, str) else None
+        frames = None
+        if cache is not None and not ignorePickled:
             try:
-                self.df = pd.read_pickle(filename + ".pkl")
+                frames = self.__stage("cache_load", cache.load)
             except Exception as ex:
-                logger.warning("loading failed, attemting to read .csv file:")
+                logger.warning("loading the cache failed, attemting to read .csv file:")
                 if logger.level == logging.DEBUG:
                     raise ex
 
-        if self.df is None:
-            logger.info("loading: %s", filename)
-            self.__load(filename)
-            self.__delete_sensor_fails()
-            self.__convert_units()
-            self.df = self.df.sort_values('time', ascending=False)
-            self.df.to_pickle(filename+".pkl")
-        self.list_of_plants = self.df.plant.unique().tolist()
-        self.rolling_mean(["1h","24h","48h","72h"],"none","1h")
-        self.__aggregate_daily()
-        self.__make_min_max()
-        self.__consistency_check()
-
-    def __make_min_max(self):
-        """Find the global min and max values for the four parameter, accross all plants and all times."""
-        self.minMax = self.df.pivot_table(values=["L", "T", "E", "S"], index=['aggSpan', 'aggFunc'], aggfunc=[np.min, np.max])
-        self.tmp=self.minMax.copy()
-        self.minMax = self.minMax.stack().stack()
-        self.minMax = self.minMax.swaplevel(1, 2)
-
-    def __delete_sensor_fails(self):
-        """ Deletes data points, where there was a sensor failure. This function acts inplace on :attr:`pyHHCC.df`."""
-        self.df = self.df[self.df["E"] < 2500]
-        self.df = self.df[self.df["L"] < 10000]
-        self.df = self.df[self.df["S"] < 100]
-        self.df = self.df[self.df["T"] < 100]
-
-    def __convert_units(self):
-        """Divide light and conductivity by 1000. This function acts inplace on :attr:`pyHHCC.df`."""
-        self.df["L"] = self.df["L"]/1000
-        self.df["E"] = self.df["E"]/1000
-
-    def __load(self, filepath):
-        """ Loads the data of the passed in filename
+        if cache is None:
+            frames = self.__stage("ingest", self.__ingest, filename, ignorePickled, workers)
+            (self.__hourly, self.__failed) = (frames["hourly"], frames["failed"])
+            self.__stage("index", lambda df: self.__index(), self.__hourly)
+        elif frames is not None:
+            logger.info("loading cached version of: %s", filename)
+            (self.__hourly, self.__failed) = (frames["hourly"], frames["failed"])
+            self.__stage("index", lambda df: self.__index(), self.__hourly)
+        else:
+            if not os.path.exists(filename) and os.path.exists(filename+".pkl"):
+                logger.info("loading legacy pkl version of: %s", filename)
+                df = pd.read_pickle(filename + ".pkl")
+                df = df[(df["aggFunc"] == "none") & (df["aggSpan"] == "1h")]
+                df = df.drop(["aggFunc", "aggSpan"], axis=1)
+                self.__failed = _encode_hours(df.iloc[:0])
+                self.__hourly = self.__stage("encode", _encode, df)
+            else:
+                logger.info("loading: %s", filename)
+                frames = self.__stage("read", _read_compact, filename, self.__stage)
+                (self.__hourly, self.__failed) = (frames["hourly"], frames["failed"])
+            self.__stage("index", lambda df: self.__index(), self.__hourly)
+            if os.path.exists(filename):
+                self.__stage("cache_save", cache.save, hourly=self.__hourly, failed=self.__failed)
+        self.minMax = {}
+        self.version = 0
+        self.__derived = _LRUCache(cacheSize)
+        self.__extrema = {}
+        self.__health = {}
+        # the names of the exports of the plants renamed by :meth:`pyHHCC.rename_plants`, which the cache and the history keep:
+        self.__names = {}
+        # the min/max index and the derived data are kept in the cache of the export or in the history, see :meth:`pyHHCC.__persist`:
+        self.__store = cache if cache is not None and os.path.exists(filename) else None
+        self.__persisted = (frozenset(), frozenset(), {})
+        loaded = self.__history is not None and os.path.exists(self.__history.path) and self.__stage("history", lambda df: self.__load_history(), self.__hourly)
+        if not loaded and frames is not None:
+            self.__restore(frames)
+        self.__stage("consistency_check", lambda df: self.__consistency_check(), self.__hourly)
+
+    @property
+    def df(self):
+        """ The hourly data of all plants, sorted by plant and time, with the columns time, E, L, S, T, plant and mac.
+        The dataframe is decoded from the compact storage on each access, use :meth:`pyHHCC.data` for single plants."""
+        return _decode(self.__hourly)
+
+    def memory_usage(self):
+        """ Returns the memory taken by the data: one row for the hourly data and one per cached aggregation (summed over the plants),
+        with the number of rows, the bytes and the bytes per row. The hourly data are held compactly (see :func:`_encode`):
+        4 bytes for the time, 2 bytes per parameter and the codes of plant and mac, which are shared with the derived data.
+
+        :returns: a dataframe with the columns rows, bytes and bytes_per_row, indexed by the data ("hourly", the hours of sensor failures as "failed", the aggregations as "aggFunc aggSpan" and "total")."""
+        usage = {"hourly": [len(self.__hourly), int(self.__hourly.memory_usage(index=True, deep=True).sum())],
+                 "failed": [len(self.__failed), int(self.__failed.memory_usage(index=True, deep=True).sum())]}
+        for ((aggSpan, aggFunc, _), (rows, size)) in self.__derived.usage().items():
+            entry = usage.setdefault("%s %s" % (aggFunc, aggSpan), [0, 0])
+            entry[0] += rows
+            entry[1] += size
+        usage["total"] = [sum(rows for (rows, _) in usage.values()), sum(size for (_, size) in usage.values())]
+        df = pd.DataFrame.from_dict(usage, orient="index", columns=["rows", "bytes"])
+        df["bytes_per_row"] = df["bytes"] / df["rows"]
+        return df
+
+    def __stage(self, name, func, *args, **kwargs):
+        """ Runs one stage of the pipeline, `func(*args, **kwargs)`, and returns its result. With `instrument` (see :class:`pyHHCC`),
+        the wall time, the rows and the memory of the dataframe passed in and of the returned dataframe(s) are recorded
+        in :attr:`pyHHCC.stages`, logged and passed to `onStage`. Otherwise, the function is just called."""
+        if not self.__instrument:
+            return func(*args, **kwargs)
+        dfIn = [arg for arg in list(args) + list(kwargs.values()) if isinstance(arg, pd.DataFrame)][:1]
+        rowsIn, bytesIn = _frame_size(dfIn)
+        startTime = perf_counter()
+        out = func(*args, **kwargs)
+        seconds = perf_counter() - startTime
+        if isinstance(out, pd.DataFrame):
+            dfOut = [out]
+        elif isinstance(out, dict):
+            dfOut = [df for df in out.values() if isinstance(df, pd.DataFrame)]
+        elif isinstance(out, tuple):
+            dfOut = [df for df in out if isinstance(df, pd.DataFrame)]
+        else:
+            dfOut = []
+        rowsOut, bytesOut = _frame_size(dfOut)
+        record = {"stage": name, "seconds": seconds, "rows_in": rowsIn, "rows_out": rowsOut, "bytes_in": bytesIn, "bytes_out": bytesOut}
+        self.stages.append(record)
+        logger.debug("stage %s: %.4f s, rows %s -> %s, bytes %s -> %s", name, seconds, rowsIn, rowsOut, bytesIn, bytesOut)
+        if self.__onStage is not None:
+            self.__onStage(record)
+        return out
+
+    def stage_report(self):
+        """ Returns the recorded stages (see `instrument` of :class:`pyHHCC`) as a dataframe with one row per executed stage, in the order of execution:
+        the name of the stage, the wall time in seconds, the rows and the memory in bytes of the dataframe(s) going in and coming out.
+        Rows and memory are empty for stages without dataframe. Stages may be nested, e.g. "make_min_max" includes the "derive" of the data it needs
+        and "read" includes the "parse", "delete_sensor_fails", "convert_units" and "encode" of each sensor block.
+        For totals per stage, use e.g. `hc.stage_report().groupby("stage").sum()`."""
+        return pd.DataFrame(self.stages, columns=["stage", "seconds", "rows_in", "rows_out", "bytes_in", "bytes_out"])
+
+    def __make_min_max(self, aggSpan, aggFunc):
+        """Find the global min and max values for the four parameter of the passed aggregation, accross all plants and all times,
+        and add them to :attr:`pyHHCC.minMax`, if they are not there yet. They are reduced from the min and max values
+        per plant (see :meth:`pyHHCC.__plant_extrema`), no data are concatenated."""
+        if (aggSpan, "E", aggFunc, "amax") in self.minMax:
+            return
+        extrema = [self.__plant_extrema(aggSpan, aggFunc, plant) for plant in self.list_of_plants]
+        mins = np.array([plantMins for (plantMins, _) in extrema])
+        maxs = np.array([plantMaxs for (_, plantMaxs) in extrema])
+        for (i, param) in enumerate(["E", "L", "S", "T"]):
+            self.minMax[aggSpan, param, aggFunc, "amin"] = np.fmin.reduce(mins[:, i])
+            self.minMax[aggSpan, param, aggFunc, "amax"] = np.fmax.reduce(maxs[:, i])
+        self.__persist()
+
+    def __plant_extrema(self, aggSpan, aggFunc, plant):
+        """ The min and max values of E, L, S and T of one plant and aggregation, from the min/max index.
+        Derived data enter the index when they are computed (see :meth:`pyHHCC.__keep`), the hourly data on first use;
+        :meth:`pyHHCC.update` maintains it from the new rows."""
+        key = (aggSpan, aggFunc, plant)
+        if key not in self.__extrema:
+            df = self.data(plant, aggFunc, aggSpan)
+            if key not in self.__extrema:
+                self.__extrema[key] = _extrema(df)
+        return self.__extrema[key]
+
+    def __keep(self, key, df, extrema=None):
+        """ Puts derived data into the cache and their min and max values into the min/max index, which keeps them after eviction."""
+        self.__derived.put(key, df)
+        self.__extrema[key] = _extrema(df) if extrema is None else extrema
+
+    def __derived_frames(self, written=None):
+        """ The min/max index and the cached derived data as dataframes for the cache, see :meth:`pyHHCC.__persist`:
+        "extrema" with one row per key (aggSpan, aggFunc, plant), the derived data of each aggregation concatenated over the plants
+        as "derived0", "derived1", ... and their rows per key as "derived".
+
+        :param written: optional, the aggregations in the cache as {(aggSpan, aggFunc): (frame, [(plant, start, stop), ...])}.
+            Then only the aggregations, whose plants changed, are returned and the ones which are gone as `None`.
+        :type written: `dict`
+        :returns: the dataframes and the aggregations in the cache after writing them, as `written`."""
+        keys = sorted(self.__extrema.keys())
+        extrema = pd.DataFrame(keys, columns=["aggSpan", "aggFunc", "plant"], dtype=object)
+        values = np.array([np.concatenate(self.__extrema[key]) for key in keys], dtype=np.float64).reshape(len(keys), 8)
+        for (i, name) in enumerate([param + "_min" for param in "ELST"] + [param + "_max" for param in "ELST"]):
+            extrema[name] = values[:, i]
+        groups = collections.defaultdict(list)
+        for ((aggSpan, aggFunc, plant), df) in self.__derived.items():
+            groups[aggSpan, aggFunc].append((plant, df))
+        written = {} if written is None else written
+        frames = {"extrema": extrema}
+        frames.update({"derived%d" % frame: None for (group, (frame, _)) in written.items() if group not in groups})
+        used = {written[group][0] for group in groups if group in written}
+        free = (frame for frame in itertools.count() if frame not in used)
+        dtypes = {"plant": self.__hourly["plant"].dtype, "mac": self.__hourly["mac"].dtype}
+        out = {}
+        for (group, entries) in groups.items():
+            if group in written and {plant for (plant, _, _) in written[group][1]} == {plant for (plant, _) in entries}:
+                out[group] = written[group]
+                continue
+            frame = written[group][0] if group in written else next(free)
+            dfs = [df.astype(dtypes) if any(df[col].dtype != dtype for (col, dtype) in dtypes.items()) else df for (_, df) in entries]
+            frames["derived%d" % frame] = pd.concat(dfs, ignore_index=True)
+            stops = np.cumsum([len(df) for df in dfs])
+            out[group] = (frame, [(plant, int(stop) - len(df), int(stop)) for ((plant, _), df, stop) in zip(entries, dfs, stops)])
+        rows = [(aggSpan, aggFunc, plant, frame, start, stop) for ((aggSpan, aggFunc), (frame, plants)) in out.items() for (plant, start, stop) in plants]
+        frames["derived"] = pd.DataFrame(rows, columns=["aggSpan", "aggFunc", "plant", "frame", "start", "stop"]).astype({"aggSpan": object, "aggFunc": object, "plant": object})
+        return (frames, out)
+
+    def __restore(self, frames):
+        """ Puts the min/max index and the derived data back from the frames of the cache (see :meth:`pyHHCC.__derived_frames`),
+        the derived data as slices of the memory mapped frames, without computing them again."""
+        if "extrema" not in frames:
+            return
+        extrema = frames["extrema"]
+        values = extrema.iloc[:, 3:].to_numpy(dtype=np.float64)
+        keys = zip(extrema["aggSpan"], extrema["aggFunc"], extrema["plant"])
+        self.__extrema = {key: (values[i, :4], values[i, 4:]) for (i, key) in enumerate(keys)}
+        derived = frames["derived"]
+        written = {}
+        rowBytes = {frame: frames["derived%d" % frame].memory_usage(index=False).sum()/max(len(frames["derived%d" % frame]), 1) for frame in derived["frame"].unique()}
+        for (aggSpan, aggFunc, plant, frame, start, stop) in derived.itertuples(index=False):
+            df = frames["derived%d" % frame].iloc[start:stop]
+            df.index = pd.RangeIndex(stop - start)
+            self.__derived.put((aggSpan, aggFunc, plant), df, int(rowBytes[frame]*(stop - start)))
+            written.setdefault((aggSpan, aggFunc), (frame, []))[1].append((plant, start, stop))
+        self.__persisted = (frozenset(self.__extrema), frozenset(self.__derived.keys()), written)
+
+    def __persist(self, save=False):
+        """ Writes the min/max index and the cached derived data to the cache of the export or to the history (see :meth:`pyHHCC.update`),
+        if they changed since, so the next instance starts with them (see :meth:`pyHHCC.__restore`). Only the aggregations, whose plants changed,
+        are written again. With `save`, the hourly data and all aggregations are written and the cache is replaced."""
+        if self.__store is None:
+            return
+        if self.__names:
+            # the cache and the history keep the names of the exports, the derived data of renamed plants are not kept:
+            if save:
+                (hourly, failed) = (df.assign(plant=df["plant"].map(lambda plant: self.__names.get(plant, plant)).astype("category"))
+                                    for df in [self.__hourly, self.__failed])
+                self.__stage("cache_save", self.__store.save, hourly=hourly, failed=failed)
+                self.__persisted = (frozenset(), frozenset(), {})
+            return
+        state = (frozenset(self.__extrema), frozenset(self.__derived.keys()))
+        if not save and state == self.__persisted[:2]:
+            return
+        if save:
+            (frames, written) = self.__derived_frames()
+            self.__stage("cache_save", self.__store.save, hourly=self.__hourly, failed=self.__failed, **frames)
+        else:
+            (frames, written) = self.__derived_frames(self.__persisted[2])
+            self.__stage("cache_save", self.__store.add, **frames)
+        self.__persisted = state + (written,)
+
+    @staticmethod
+    def __delete_sensor_fails(df):
+        """ Returns the passed dataframe without the data points, where there was a sensor failure."""
+        return df[pyHHCC.__sensor_ok(df)]
+
+    @staticmethod
+    def __sensor_ok(df):
+        """ The mask of the data points of the raw data without sensor failure: all values are present and within the range of the sensor."""
+        return (df["E"] < 2500) & (df["L"] < 10000) & (df["S"] < 100) & (df["T"] < 100)
+
+    @staticmethod
+    def __sensor_fails(df):
+        """ The hours of the data points of the raw data, which :meth:`pyHHCC.__delete_sensor_fails` drops, encoded by :func:`_encode_hours`.
+        Hours without any value are no failure."""
+        return _encode_hours(df[~pyHHCC.__sensor_ok(df) & df[["E", "L", "S", "T"]].notna().any(axis=1)])
+
+    @staticmethod
+    def __convert_units(df):
+        """ Returns the passed dataframe with light and conductivity divided by 1000."""
+        return df.assign(L=df["L"]/1000, E=df["E"]/1000)
+
+    @staticmethod
+    def read(filepath, failures=False):
+        """ Parses the export and returns its hourly data, cleaned from sensor failures and converted to the units of :attr:`pyHHCC.df`.
+        The file is tokenized in a single pass: per sensor block, the timestamps, parameters and values are collected
+        as NumPy arrays and the dataframe is built in one step.
 
         :param filepath: full path + filename, including file extension
-        :type filepath: `str`"""
-        self.df = pd.DataFrame()
+        :type filepath: `str`
+        :param failures: `True` to also return the hours of the sensor failures (see :meth:`pyHHCC.health`), encoded by :func:`_encode_hours`. Defaults to `False`.
+        :type failures: `bool`, optional
+        :returns: the dataframe or, with `failures`, a tuple of the dataframe and the failures."""
+        df = pyHHCC.__parse(filepath)
+        out = pyHHCC.__convert_units(pyHHCC.__delete_sensor_fails(df))
+        return (out, pyHHCC.__sensor_fails(df)) if failures else out
+
+    @staticmethod
+    def __parse(filepath):
+        """ Returns the raw data of the export, see :meth:`pyHHCC.read`."""
         with open(filepath, encoding='utf16') as fp:
-            line = fp.readline()
-            line = line
-            cnt = 1
-            while line:
+            blocks = list(pyHHCC.__iter_raw_blocks(fp))
+        if not blocks:
+            raise ValueError("no 'Flower Care' sensor block found in: %s" % filepath)
+        return pyHHCC.__frame(blocks)
+
+    @staticmethod
+    def __ingest(filepaths, ignorePickled=False, workers=1):
+        """ Parses several exports, e.g. from different phones, and merges them into one dataset.
+        The files are parsed by a pool of processes with `workers` > 1, each file is read from its own cache
+        if it did not change since (see :func:`_read_export`). Hours that are contained in several files are kept once per sensor (mac),
+        the values of the most recent file in `filepaths` win.
+
+        :param filepaths: full paths + filenames, including file extension, from the oldest to the most recent file
+        :type filepaths: `list`
+        :param ignorePickled: `True` to reparse all files.
+        :type ignorePickled: `bool`
+        :param workers: The number of processes, `None` for one per CPU.
+        :type workers: `int`
+        :returns: a dict with the encoded hourly data as "hourly" and the hours of the sensor failures as "failed"."""
+        if not filepaths:
+            raise ValueError("no files to load")
+        if workers == 1 or len(filepaths) == 1:
+            frames = [_read_export(filepath, ignorePickled) for filepath in filepaths]
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+                frames = list(pool.map(_read_export, filepaths, [ignorePickled]*len(filepaths)))
+        hourly = _concat_encoded([frame["hourly"] for frame in frames])
+        hourly = hourly.drop_duplicates(["mac", "hour"], keep="last")
+        logger.info("%d data points from %d files, %d of them in several files", len(hourly), len(filepaths), sum(len(frame["hourly"]) for frame in frames) - len(hourly))
+        failed = pd.concat(_shared_categories([frame["failed"] for frame in frames]), ignore_index=True, sort=False)
+        return {"hourly": hourly, "failed": failed.drop_duplicates(["mac", "hour"])}
+
+    @staticmethod
+    def iter_blocks(filepath, failures=False, stage=None):
+        """ Reads the export sensor block by sensor block. For each "Flower Care" block, one dataframe is yielded,
+        which is already cleaned from sensor failures and converted to the units of :attr:`pyHHCC.df`.
+        Only one block is held in memory at a time. The constructor builds the compact storage from these blocks.
+
+        :param filepath: full path + filename, including file extension
+        :type filepath: `str`
+        :param failures: `True` to also yield the hours of the sensor failures of the block, as tuple, see :meth:`pyHHCC.read`. Defaults to `False`.
+        :type failures: `bool`, optional
+        :param stage: optional, runs the steps of each block as `stage(name, func, *args)`, see :meth:`pyHHCC.__stage`."""
+        stage = (lambda name, func, *args: func(*args)) if stage is None else stage
+        with open(filepath, encoding='utf16') as fp:
+            for line in fp:
                 if (line.find("Flower Care")) >= 0:
-                    mac = line[13:-2]
-                    raw_dates = fp.readline()
-                    cnt += 1
-                    dates = raw_dates.split("\t")
-                    dates = list(filter(None, dates))
-                    name = dates.pop(0)
-                    raw_params = fp.readline()
-                    params = raw_params.split("\t")
-                    params = params[1:-1]
-                    dates = [dates[(i)//4] for i in range((len(dates)-1)*4)]
-                    for _ in range(24):
-                        raw_line = fp.readline()
-                        cnt += 1
-                        value_line = raw_line.split("\t")
-                        value_line = value_line[0:-1]
-                        hour = value_line.pop(0)
-                        hour = hour[1:-1]
-                        df_loop = pd.DataFrame([dates, params, value_line], index=['date', 'parameter', 'value']).T
-                        if hour == "24:00":
-                            df_loop['hour'] = "00:00"
-                            df_loop['time'] = pd.to_datetime(df_loop["date"]+" "+df_loop["hour"])
-                            df_loop['time'] = df_loop['time']+ pd.DateOffset(days=1)
-                        else:
-                            df_loop['hour'] = hour
-                            df_loop['time'] = pd.to_datetime(df_loop["date"]+" "+df_loop["hour"])
-                        df_loop = df_loop.drop(['date', 'hour'], axis=1)
-                        df_loop['value'] = pd.to_numeric(df_loop['value'], errors='coerce')
-                        df_loop = df_loop[np.isnan(df_loop['value']) == False]
-                        df_loop = df_loop.pivot(values="value", index="time", columns="parameter")
-                        df_loop = df_loop.reset_index()
-                        df_loop['plant'] = name
-                        df_loop['mac'] = mac
-                        df_loop["aggFunc"] = "none"
-                        df_loop["aggSpan"] = "1h"
-                        self.df = self.df.append(df_loop, ignore_index=True)
-                line = fp.readline()
-                cnt += 1
-        self.__mem_squeeze(self.df)
+                    df = stage("parse", lambda line, fp: pyHHCC.__frame([pyHHCC.__parse_block(line, fp)]), line, fp)
+                    out = stage("delete_sensor_fails", pyHHCC.__delete_sensor_fails, df)
+                    out = stage("convert_units", pyHHCC.__convert_units, out)
+                    yield (out, stage("delete_sensor_fails", pyHHCC.__sensor_fails, df)) if failures else out
+
+    @staticmethod
+    def convert(filepath, outputfile):
+        """ Converts the export to a .csv file with one row per time and sensor, as in :attr:`pyHHCC.df`.
+        The export is processed with :meth:`pyHHCC.iter_blocks` and each block is appended to `outputfile` directly,
+        so the peak memory depends on the largest sensor block and not on the whole export.
+        The .csv file can be loaded by :class:`pyHHCC` like an export, without the hours of sensor failures.
+
+        :param filepath: full path + filename of the export, including file extension
+        :type filepath: `str`
+        :param outputfile: full path + filename of the .csv file to write
+        :type outputfile: `str`"""
+        header = True
+        for df in pyHHCC.iter_blocks(filepath):
+            df.to_csv(outputfile, mode="w" if header else "a", header=header, index=False)
+            header = False
+
+    @staticmethod
+    def __iter_raw_blocks(fp):
+        """ Yields the parsed sensor blocks of the opened export `fp`, see :meth:`pyHHCC.__parse_block`."""
+        for line in fp:
+            if (line.find("Flower Care")) >= 0:
+                yield pyHHCC.__parse_block(line, fp)
+
+    @staticmethod
+    def __frame(blocks):
+        """ Builds the dataframe of the raw data from a list of parsed sensor blocks in one step."""
+        plants = np.array([b[0] for b in blocks], dtype=object)
+        macs = np.array([b[1] for b in blocks], dtype=object)
+        block = np.concatenate([np.full(len(b[2]), i) for (i, b) in enumerate(blocks)])
+        row, time, params, values = (np.concatenate(x) for x in list(zip(*blocks))[2:])
+        values = pyHHCC.__to_float(values)
+        ok = ~np.isnan(values)
+        df = pd.DataFrame({'block': block[ok], 'row': row[ok], 'time': time[ok], 'parameter': params[ok], 'value': values[ok]})
+        # (block, row, time) keeps the order of the file: sensor block by block, hour row by hour row.
+        df = df.set_index(['block', 'row', 'time', 'parameter'])['value'].unstack()
+        df = df.reset_index()
+        df['plant'] = plants[df['block']]
+        df['mac'] = macs[df['block']]
+        df = df.drop(['block', 'row'], axis=1)
+        pyHHCC.__mem_squeeze(df)
+        return df
+
+    @staticmethod
+    def __to_float(values):
+        """ Converts an array of strings to floats, empty or invalid strings become NaN. """
+        out = np.full(len(values), np.nan)
+        filled = values != ""
+        try:
+            out[filled] = values[filled].astype(float)
+        except ValueError:
+            out[filled] = pd.to_numeric(values[filled], errors='coerce')
+        return out
+
+    @staticmethod
+    def __parse_block(line, fp):
+        """ Parses one sensor block, starting at its "Flower Care" line. The following lines are read from `fp`:
+        the plant name with the dates, the parameter names and the 24 hour rows.
+
+        :returns: plant, mac and the flat arrays hour row, time, parameter and value (as string), one entry per cell."""
+        mac = line[13:-2]
+        dates = next(fp, "").split("\t")
+        dates = list(filter(None, dates))
+        name = dates.pop(0)
+        params = next(fp, "").split("\t")
+        params = np.array(params[1:-1], dtype=object)
+        ncols = (len(dates)-1)*4
+        dates = pd.to_datetime(np.repeat(dates[:-1], 4)).to_numpy()
+        hours = np.zeros(24, dtype='timedelta64[m]')
+        values = np.full((24, ncols), "", dtype=object)
+        for i in range(24):
+            value_line = next(fp, "").split("\t")
+            value_line = value_line[0:-1]
+            hour = value_line.pop(0)
+            hour = hour[1:-1].split(":")
+            # "24:00" is midnight of the next day:
+            hours[i] = int(hour[0])*60 + int(hour[1])
+            values[i, :min(ncols, len(value_line))] = value_line[:ncols]
+        time = dates[np.newaxis, :] + hours[:, np.newaxis]
+        row = np.repeat(np.arange(24), ncols)
+        return name, mac, row, time.ravel(), np.tile(params[:ncols], 24), values.ravel()
 
     @staticmethod
     def __flatten(li):
@@ -154,91 +1255,585 @@ class pyHHCC:
         """ Applies optimizations to the passed dataframe to use 'pd.Categorial' and to downcast the floats, where possible. """
         df['mac'] = pd.Categorical(df.mac)
         df['plant'] = pd.Categorical(df.plant)
-        df['plant'] = pd.Categorical(df.plant)
-        df['aggFunc'] = pd.Categorical(df.aggFunc)
-        df['aggSpan'] = pd.Categorical(df.aggSpan)
         df["T"] = pd.to_numeric(df["T"], downcast='float')
         df["E"] = pd.to_numeric(df["E"], downcast='float')
         df["L"] = pd.to_numeric(df["L"], downcast='float')
         df["S"] = pd.to_numeric(df["S"], downcast='float')
-        #hc.df.melt(id_vars=['plant','mac','time','aggFunc','aggSpan'],value_vars=["T","S","L","E"],var_name="parameter")
 
     def __consistency_check(self):
-        """ Checks :attr:`pyHHCC.df` for consistency and raises warning messages for the following case: The sensor can only store data for +-30(?) days. Therefore, warn the user to sync soon enough (15 days). """
+        """ Checks :attr:`pyHHCC.df` for consistency and raises warning messages for the following case: The sensor can only store data for +-30(?) days. Therefore, warn the user to sync soon enough (15 days). See the rule "stale" of :meth:`pyHHCC.health`."""
         warnTimeLimit = "15 days"
-        self.df["no update for"] = pd.to_timedelta(dt.datetime.now()-self.df["time"])
-        noUpSinceTable = self.df.pivot_table(values='no update for', aggfunc=np.min, index="plant")
-        noUpSinceBool = self.df.pivot_table(values='no update for', aggfunc=np.min, index="plant") > pd.to_timedelta(warnTimeLimit)
-        noUpSinceBoolSum = noUpSinceBool.agg("sum").values[0]
-        if noUpSinceBoolSum > 0:
+        result = self.health([{"name": "no update", "kind": "stale", "duration": warnTimeLimit}])
+        if result["alert"].any():
+            noUpSinceTable = pd.DataFrame({"no update for": pd.to_timedelta(result["value"].to_numpy(), unit="h")}, index=pd.Index(result["plant"], name="plant"))
             logger.warning("at least one plant was not updated for %s since today:\n %s", warnTimeLimit,
-                             noUpSinceTable.sort_values(by=['no update for'], ascending=False).astype("timedelta64[D]").to_string())
-        self.df.drop(["no update for"], axis=1, inplace=True)
-
-    def __aggregate_daily(self):
-        """ The raw data are provided on an 1h basis. This function calculates min, max, mean and sum
-        for each parameter per day. This function acts inplace on :attr:`pyHHCC.df`."""
-        df = self.df[(self.df["aggFunc"] == "none") & (self.df["aggSpan"] == "1h") ].copy()
-        df['time'] = pd.to_datetime(df['time'].dt.date)+pd.to_timedelta("12h")
-        self.__aggregate_daily_helper(df, np.sum, "sum", "daily")
-        self.__aggregate_daily_helper(df, np.min, "min", "daily")
-        self.__aggregate_daily_helper(df, np.max, "max", "daily")
-        self.__aggregate_daily_helper(df, np.mean, "mean", "daily")
-        self.df.reset_index(drop=True, inplace=True)
-        self.__mem_squeeze(self.df)
-        self.df = self.df.sort_values('time', ascending=False)
-
-    def __aggregate_daily_helper(self, df, aggFunc, aggFunc_label, aggSpan):
-        dd = df.pivot_table(values=["L", "T", "E", "S"], index=['time', 'plant', 'mac'], aggfunc=aggFunc)
-        dd.reset_index(inplace=True)
-        dd["aggFunc"] = aggFunc_label
-        dd["aggSpan"] = aggSpan
-        self.df = self.df.append(dd, sort=False)
-
-    def rolling_mean(self, wnds, aggFunc, aggSpan):
-        df=self.df[(self.df["aggFunc"] == aggFunc) & (self.df["aggSpan"] == aggSpan)]
-        df=df.drop("aggFunc",axis=1)
-        df=df.drop("aggSpan",axis=1)
-        df=df.set_index(["plant","mac","time"]).sort_index()
-        df_toappend = pd.DataFrame()
+                             (noUpSinceTable.sort_values(by=["no update for"], ascending=False) // pd.to_timedelta("1D")).to_string())
+
+    def health(self, rules=None, plants=None):
+        """ Evaluates health rules per plant, e.g. for alerts. Each rule is evaluated for all plants in one vectorized pass over the hourly data.
+        The results are kept per rule and plant, so after :meth:`pyHHCC.update`, only the plants with new data are evaluated again.
+
+        Each rule is a dict with a "name", a "kind" and a "duration", processed by `pd.to_timedelta`. The kinds are:
+
+        * "stale": no data for longer than the duration, i.e. the sensor needs to be synced. `value` is the hours since the latest data point.
+        * "threshold": the values of "param" are "below" (or "above") the passed value for at least the duration, up to the latest data point of the plant.
+          A missing hour ends the period. `value` is the hours of the period, `since` its first hour.
+        * "failures": more than the fraction "above" of the data points within the duration up to the latest one were sensor failures
+          (see :meth:`pyHHCC.__delete_sensor_fails`). `value` is the fraction.
+
+        :param rules: The rules, defaults to :attr:`pyHHCC.healthRules`.
+        :type rules: `list`, optional
+        :param plants: The names of the plants, defaults to all plants.
+        :type plants: `list`, optional
+        :returns: a dataframe with one row per rule and plant and the columns rule, plant, alert (`bool`), value and since (the start of the evaluated period)."""
+        rules = self.healthRules if rules is None else rules
+        plants = self.list_of_plants if plants is None else [plant for plant in plants if plant in self.__rows]
+        frames = []
+        for rule in rules:
+            if rule["kind"] == "stale":
+                # depends on the current time and is not kept:
+                (alert, value, since) = self.__stage("health", self.__evaluate, rule, plants)
+            else:
+                kept = self.__health.setdefault(tuple(sorted(rule.items())), {})
+                missing = [plant for plant in plants if plant not in kept]
+                if missing:
+                    kept.update(zip(missing, zip(*self.__stage("health", self.__evaluate, rule, missing))))
+                (alert, value, since) = (np.array(x) for x in zip(*[kept[plant] for plant in plants])) if plants else ([], [], [])
+            frames.append(pd.DataFrame({"rule": rule["name"], "plant": plants, "alert": np.asarray(alert, dtype=bool),
+                                        "value": np.asarray(value, dtype=np.float64), "since": np.asarray(since, dtype="datetime64[ns]")}))
+        return pd.concat(frames, ignore_index=True)
+
+    def __evaluate(self, rule, plants):
+        """ Evaluates one rule of :meth:`pyHHCC.health` for the passed plants (with data) in one pass over their hourly data.
+
+        :returns: the arrays alert, value and since, one entry per plant."""
+        hours = self.__hourly["hour"].to_numpy()
+        bounds = np.array([self.__rows[plant] for plant in plants], dtype=np.int64).reshape(-1, 2)
+        duration = pd.to_timedelta(rule["duration"]) / pd.to_timedelta("1h")
+        if rule["kind"] == "stale":
+            latest = _EPOCH + hours[bounds[:, 1] - 1]
+            value = (np.datetime64(dt.datetime.now(), "ns") - latest) / np.timedelta64(1, "h")
+            return (value > duration, value, latest)
+
+        # the rows of the plants, one after the other, sorted by time:
+        lengths = bounds[:, 1] - bounds[:, 0]
+        rows = np.repeat(bounds[:, 0] - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths) + np.arange(lengths.sum())
+        codes = np.repeat(np.arange(len(plants)), lengths)
+        hour = hours[rows].astype(np.int64)
+        last = np.cumsum(lengths) - 1
+        if rule["kind"] == "threshold":
+            values = _decode_values(self.__hourly[rule["param"]].to_numpy()[rows], _RESOLUTION[rule["param"]])
+            holds = values < rule["below"] if "below" in rule else values > rule["above"]
+            # a period starts at the first row of a plant, after a missing hour or after a row, where the rule does not hold:
+            position = np.arange(len(rows))
+            first = np.ones(len(rows), dtype=bool)
+            first[1:] = (codes[1:] != codes[:-1]) | (hour[1:] - hour[:-1] != 1)
+            begin = np.maximum.accumulate(np.where(holds, np.where(first, position, 0), position + 1))
+            begin = np.minimum(begin[last], last)
+            value = np.where(holds[last], hour[last] - hour[begin] + 1, 0)
+            since = np.where(holds[last], _EPOCH + hour[begin], np.datetime64("NaT"))
+            return (value >= duration, value, since)
+        if rule["kind"] == "failures":
+            index = pd.Index(plants).get_indexer(self.__failed["plant"].cat.categories)[self.__failed["plant"].cat.codes.to_numpy()]
+            failedCodes = index[index >= 0]
+            failedHour = self.__failed["hour"].to_numpy()[index >= 0].astype(np.int64)
+            latest = hour[last].copy()
+            np.maximum.at(latest, failedCodes, failedHour)
+            begin = latest - int(duration) + 1
+            # the rows are sorted by plant and hour, so the rows within the period are found by a binary search:
+            key = codes*2**32 + hour
+            ok = last + 1 - np.searchsorted(key, np.arange(len(plants))*2**32 + begin, side="left")
+            failed = np.bincount(failedCodes[failedHour >= begin[failedCodes]], minlength=len(plants))
+            value = failed / np.maximum(failed + ok, 1)
+            return (value > rule["above"], value, _EPOCH + begin)
+        raise ValueError("unknown kind of rule: %s" % rule["kind"])
+
+    @staticmethod
+    def __period(time, aggSpan):
+        """ Returns the start and the middle of the calendar periods "daily", "weekly" (Monday to Sunday) or "monthly",
+        which the passed times (datetime64) fall into. The middle is noon of the day, Thursday noon of the week and noon of the 15th of the month."""
+        day = time.astype("datetime64[D]")
+        if aggSpan == "daily":
+            start = day
+            middle = start + np.timedelta64(12, "h")
+        elif aggSpan == "weekly":
+            # 1970-01-01 was a Thursday:
+            start = day - (day.astype(np.int64) + 3) % 7
+            middle = start + np.timedelta64(3*24 + 12, "h")
+        elif aggSpan == "monthly":
+            start = time.astype("datetime64[M]").astype("datetime64[D]")
+            middle = start + np.timedelta64(14*24 + 12, "h")
+        else:
+            raise ValueError("unknown calendar period: %s" % aggSpan)
+        return (start.astype("datetime64[ns]"), middle.astype("datetime64[ns]"))
+
+    @staticmethod
+    def __calendar(df, aggSpan="daily", params=("E", "L", "S", "T")):
+        """ Aggregates the passed hourly data per calendar period (see :meth:`pyHHCC.__period`) and sensor in one pass over the data:
+        the sum, min, max, mean, count and standard deviation (sample) of each parameter, ignoring missing values.
+        The data are sorted by period, plant and mac once and all aggregates are reduced from the same group boundaries.
+        The variance is summed relative to the first value of each group, which keeps it accurate in a single pass.
+
+        :returns: a dict with (aggFunc, aggSpan) as keys and dataframes as values, each with the time in the middle of the period."""
+        (_, middle) = pyHHCC.__period(df["time"].to_numpy(), aggSpan)
+        if len(df) == 0:
+            # there are no periods, the reductions do not take empty data:
+            empty = df[["time"] + list(params) + ["plant", "mac"]].astype({param: np.float32 for param in params})
+            empty.columns.name = "parameter"
+            return {(aggFunc, aggSpan): pyHHCC.__layout(empty) for aggFunc in _CALENDAR_AGGREGATES}
+        plantCodes = df["plant"].cat.codes.to_numpy()
+        macCodes = df["mac"].cat.codes.to_numpy()
+        order = np.lexsort((macCodes, plantCodes, middle.view(np.int64)))
+        (middle, plantCodes, macCodes) = (middle[order], plantCodes[order], macCodes[order])
+        values = df[list(params)].to_numpy(dtype=np.float64)[order]
+        newGroup = np.concatenate([[True], (middle[1:] != middle[:-1]) | (plantCodes[1:] != plantCodes[:-1]) | (macCodes[1:] != macCodes[:-1])])
+        starts = np.flatnonzero(newGroup)
+        valid = ~np.isnan(values)
+        count = np.add.reduceat(valid, starts, axis=0).astype(np.float64)
+        # shift each group by its first value for the sums of squares:
+        shift = np.nan_to_num(values[starts])
+        centered = np.where(valid, values - np.repeat(shift, np.diff(np.append(starts, len(values))), axis=0), 0)
+        sumCentered = np.add.reduceat(centered, starts, axis=0)
+        sumSquares = np.add.reduceat(centered**2, starts, axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # empty groups give NaN, single values give NaN for the standard deviation
+            aggregates = {"sum": sumCentered + shift*count,
+                          "min": np.fmin.reduceat(values, starts, axis=0),
+                          "max": np.fmax.reduceat(values, starts, axis=0),
+                          "mean": sumCentered/count + shift,
+                          "count": count,
+                          "std": np.sqrt(np.maximum(sumSquares - sumCentered**2/count, 0)/(count - 1))}
+        aggregates["mean"][count == 0] = np.nan
+        keys = pd.DataFrame({"time": middle[starts],
+                             "plant": pd.Categorical.from_codes(plantCodes[starts], dtype=df["plant"].dtype),
+                             "mac": pd.Categorical.from_codes(macCodes[starts], dtype=df["mac"].dtype)})
+        out = {}
+        for (aggFunc, aggregate) in aggregates.items():
+            frame = pd.concat([keys, pd.DataFrame(aggregate.astype(np.float32), columns=list(params))], axis=1)
+            frame.columns.name = "parameter"
+            out[aggFunc, aggSpan] = pyHHCC.__layout(frame)
+        return out
+
+    def __index(self):
+        """ Sorts the hourly data by plant and time (if they are not yet) and stores the rows of each plant,
+        so the hourly data of a plant are a slice of the hourly data of all plants."""
+        codes = self.__hourly["plant"].cat.codes.to_numpy()
+        hour = self.__hourly["hour"].to_numpy()
+        newPlant = codes[1:] != codes[:-1]
+        if np.any(codes[1:] < codes[:-1]) or np.any((hour[1:] < hour[:-1]) & ~newPlant):
+            self.__hourly = self.__hourly.sort_values(["plant", "hour"], kind="mergesort")
+            codes = self.__hourly["plant"].cat.codes.to_numpy()
+            newPlant = codes[1:] != codes[:-1]
+        self.__hourly = self.__hourly.reset_index(drop=True)
+        starts = np.concatenate([[0], np.flatnonzero(newPlant) + 1])
+        stops = np.concatenate([starts[1:], [len(codes)]])
+        categories = self.__hourly["plant"].cat.categories
+        self.__rows = {categories[codes[start]]: (start, stop) for (start, stop) in zip(starts, stops)}
+        self.list_of_plants = list(self.__rows.keys())
+
+    def data(self, plant, aggFunc="none", aggSpan="1h", start=None, end=None):
+        """ Returns the data of one plant for the passed aggregation, sorted by time. The data are looked up
+        by (aggSpan, aggFunc, plant) and cut to the time span by a binary search, no table is scanned.
+        The hourly data are decoded from a slice of the compact storage (see :meth:`pyHHCC.memory_usage`). Derived data are computed on first use and kept
+        in a cache, limited by `cacheSize` (see :class:`pyHHCC`).
+
+        :param plant: Name of the plant (for names, check :attr:`pyHHCC.list_of_plants`)
+        :type plant: `str`
+        :param aggFunc: "none" for the hourly data, "mean" for rolling means, or "sum", "min", "max", "mean", "count", "std" for the aggregates per calendar period.
+        :type aggFunc: `str`, optional
+        :param aggSpan: "1h" for the hourly data, the window of rolling means (e.g. "48h"), or the calendar period "daily", "weekly" or "monthly".
+        :type aggSpan: `str`, optional
+        :param start: optional, the first time to return (inclusive), processed by `pd.Timestamp`.
+        :param end: optional, the last time to return (inclusive), processed by `pd.Timestamp`.
+        :returns: a dataframe with the columns time, E, L, S, T, plant and mac, without rows for an unknown plant."""
+        if (aggSpan, aggFunc) == ("1h", "none"):
+            (first, last) = self.__rows.get(plant, (0, 0))
+            df = _decode(self.__hourly.iloc[first:last])
+        elif plant not in self.__rows:
+            # the aggregation is checked, but nothing is kept for an unknown plant:
+            df = self.__derive(self.data(plant), aggFunc, aggSpan)[aggFunc, aggSpan]
+        else:
+            key = (aggSpan, aggFunc, plant)
+            df = self.__derived.get(key)
+            if df is None:
+                derived = self.__stage("derive", self.__derive, self.data(plant), aggFunc, aggSpan)
+                for ((derivedFunc, derivedSpan), derivedDf) in derived.items():
+                    self.__keep((derivedSpan, derivedFunc, plant), derivedDf)
+                df = derived[aggFunc, aggSpan]
+        if (start is not None) or (end is not None):
+            df = df.iloc[slice(*pyHHCC.__cut(df["time"].to_numpy(), start, end))]
+        return df
+
+    @staticmethod
+    def __cut(time, start=None, end=None):
+        """ The first and the last row (exclusive) of the sorted `time` within `start` and `end` (both inclusive), by a binary search."""
+        first = 0 if start is None else np.searchsorted(time, pd.Timestamp(start).to_datetime64(), side="left")
+        last = len(time) if end is None else np.searchsorted(time, pd.Timestamp(end).to_datetime64(), side="right")
+        return (first, last)
+
+    def series(self, plant, param, aggFunc="none", aggSpan="1h", start=None, end=None):
+        """ Returns one parameter of one plant as NumPy arrays, e.g. to check them for alerts without the overhead of a dataframe.
+        The hourly values are decoded from a slice of the compact storage, only for `param`. Derived data are
+        returned as read-only views of the cached derived data (see :meth:`pyHHCC.data`), without copying them.
+
+        :param plant: Name of the plant (for names, check :attr:`pyHHCC.list_of_plants`)
+        :type plant: `str`
+        :param param: One of the four parameters: E, L, S, T.
+        :type param: `str`
+        :param aggFunc: see :meth:`pyHHCC.data`
+        :type aggFunc: `str`, optional
+        :param aggSpan: see :meth:`pyHHCC.data`
+        :type aggSpan: `str`, optional
+        :param start: optional, the first time to return (inclusive), processed by `pd.Timestamp`.
+        :param end: optional, the last time to return (inclusive), processed by `pd.Timestamp`.
+        :returns: the times (datetime64[ns]) and the values (float32, NaN if missing), as a tuple of two arrays of the same length."""
+        (time, values) = self.__series(plant, [param], aggFunc, aggSpan, start, end)
+        return (time, values[param])
+
+    def series_batch(self, params=("E", "L", "S", "T"), plants=None, aggFunc="none", aggSpan="1h", start=None, end=None):
+        """ :meth:`pyHHCC.series` for many plants and parameters at once. Rolling means, which are not cached yet,
+        are computed for all plants in one pass first (see :meth:`pyHHCC.rolling_mean`).
+
+        :param params: The parameters, defaults to all four.
+        :type params: `list`, optional
+        :param plants: The names of the plants, defaults to all plants.
+        :type plants: `list`, optional
+        :returns: a dict with (plant, param) as keys and the tuples (times, values) as values. The times are the same array for all parameters of a plant."""
+        plants = self.list_of_plants if plants is None else plants
+        self.__prefetch(plants, aggFunc, aggSpan)
+        out = {}
+        for plant in plants:
+            (time, values) = self.__series(plant, params, aggFunc, aggSpan, start, end)
+            out.update({(plant, param): (time, values[param]) for param in params})
+        return out
+
+    def __series(self, plant, params, aggFunc, aggSpan, start, end):
+        """ The times and a dict with the values per parameter, see :meth:`pyHHCC.series`."""
+        if (aggSpan, aggFunc) == ("1h", "none"):
+            (first, last) = self.__rows.get(plant, (0, 0))
+            hours = self.__hourly["hour"].to_numpy()[first:last]
+            # the bounds are rounded to the full hours within, to cut the hours before decoding them:
+            (start, end) = (None if t is None else (pd.Timestamp(t).to_datetime64() - _EPOCH) / np.timedelta64(1, "h") for t in (start, end))
+            cut = slice(first if start is None else first + np.searchsorted(hours, np.ceil(start), side="left"),
+                        last if end is None else first + np.searchsorted(hours, np.floor(end), side="right"))
+            time = (_EPOCH + self.__hourly["hour"].to_numpy()[cut]).astype("datetime64[ns]")
+            return (time, {param: _decode_values(self.__hourly[param].to_numpy()[cut], _RESOLUTION[param]) for param in params})
+        df = self.data(plant, aggFunc, aggSpan)
+        time = df["time"].to_numpy()
+        cut = slice(*pyHHCC.__cut(time, start, end))
+        out = {}
+        for param in list(params) + ["time"]:
+            view = (time if param == "time" else df[param].to_numpy())[cut]
+            view.flags.writeable = False
+            out[param] = view
+        return (out.pop("time"), out)
+
+    def __prefetch(self, plants, aggFunc, aggSpan):
+        """ Computes the rolling means `aggSpan` of all plants in one pass, if they are not cached for one of the `plants`."""
+        if aggFunc == "mean" and aggSpan not in ["1h", "daily", "weekly", "monthly"]:
+            if any((aggSpan, aggFunc, plant) not in self.__derived for plant in plants):
+                self.rolling_mean([aggSpan])
+
+    def export(self, filepath, params=("E", "L", "S", "T"), plants=None, aggFunc="none", aggSpan="1h", start=None, end=None):
+        """ Writes the data of many plants to one file in bulk, as a table with the columns time, plant, mac and `params`,
+        sorted by plant and time. The format follows the file extension: ".csv", ".parquet" or ".arrow" (".feather").
+        Parquet and Arrow are written by pandas and need the optional package pyarrow.
+
+        :param filepath: full path + filename, including file extension
+        :type filepath: `str`
+        :param params: The parameters, defaults to all four.
+        :type params: `list`, optional
+        :param plants: The names of the plants, defaults to all plants.
+        :type plants: `list`, optional
+
+        For the other parameters, see :meth:`pyHHCC.data`.
+
+        :returns: the number of written rows."""
+        ext = os.path.splitext(filepath)[1].lower()
+        if ext not in [".csv", ".parquet", ".arrow", ".feather"]:
+            raise ValueError("unknown format of: %s, use .csv, .parquet or .arrow" % filepath)
+        plants = self.list_of_plants if plants is None else plants
+        self.__prefetch(plants, aggFunc, aggSpan)
+        frames = [self.data(plant, aggFunc, aggSpan, start, end)[["time", "plant", "mac"] + list(params)] for plant in plants]
+        df = pd.concat(frames, ignore_index=True)
+        if ext == ".csv":
+            df.to_csv(filepath, index=False)
+        elif ext == ".parquet":
+            df.to_parquet(filepath, index=False)
+        else:
+            df.to_feather(filepath)
+        return len(df)
+
+    @staticmethod
+    def __layout(df):
+        """ Brings derived data to the common layout: the columns time, E, L, S, T, plant and mac, sorted by time (if they are not yet)."""
+        df = df[["time"] + [param for param in ["E", "L", "S", "T"] if param in df.columns] + ["plant", "mac"]]
+        if not df["time"].is_monotonic_increasing:
+            df = df.sort_values("time", kind="mergesort")
+        return df.reset_index(drop=True)
+
+    @staticmethod
+    def __derive(raw, aggFunc, aggSpan):
+        """ Computes the aggregation (aggFunc, aggSpan) from the passed hourly data. As the aggregates of a calendar period
+        are computed together, all of them are returned.
+
+        :returns: a dict with (aggFunc, aggSpan) as keys and dataframes as values."""
+        if aggSpan in ["daily", "weekly", "monthly"]:
+            if aggFunc not in _CALENDAR_AGGREGATES:
+                raise ValueError("unknown aggFunc of a calendar period: %s, use one of %s" % (aggFunc, ", ".join(_CALENDAR_AGGREGATES)))
+            return pyHHCC.__calendar(raw, aggSpan)
+        if aggFunc == "mean":
+            return {(aggFunc, aggSpan): pyHHCC.__rolling(raw, aggSpan)}
+        raise ValueError("unknown aggregation: aggFunc=%s, aggSpan=%s" % (aggFunc, aggSpan))
+
+    def grid(self, plants=None, start=None, end=None, params=("E", "L", "S", "T")):
+        """ Puts the hourly data of each sensor (plant and mac) on a regular grid of whole days, with NaN for missing hours,
+        e.g. to compute on all sensors at once by array operations, see :class:`HourlyGrid`. The grid is filled from the compact storage
+        in one pass: the position of each data point is its sensor and its hour since the start of the grid.
+
+        :param plants: The names of the plants, defaults to all plants.
+        :type plants: `list`, optional
+        :param start: optional, the first day of the grid, processed by `pd.Timestamp`. Defaults to the day of the earliest data point.
+        :param end: optional, the last day of the grid (inclusive), processed by `pd.Timestamp`. Defaults to the day of the latest data point.
+        :param params: The parameters, defaults to all four.
+        :type params: `list`, optional
+        :returns: the :class:`HourlyGrid`."""
+        plants = self.list_of_plants if plants is None else [plant for plant in plants if plant in self.__rows]
+        rows = np.concatenate([np.arange(*self.__rows[plant]) for plant in plants]) if plants else np.zeros(0, dtype=np.int64)
+        hour = self.__hourly["hour"].to_numpy()[rows].astype(np.int64)
+        day = lambda t: int((pd.Timestamp(t).to_datetime64().astype("datetime64[D]") - _EPOCH.astype("datetime64[D]")) / np.timedelta64(1, "D"))
+        first = 24*(day(start) if start is not None else hour.min()//24 if len(hour) else 0)
+        stop = 24*((day(end) if end is not None else hour.max()//24 if len(hour) else -1) + 1)
+        inside = (hour >= first) & (hour < stop)
+        (rows, hour) = (rows[inside], hour[inside])
+
+        plant = self.__hourly["plant"].cat.codes.to_numpy()[rows].astype(np.int64)
+        mac = self.__hourly["mac"].cat.codes.to_numpy()[rows].astype(np.int64)
+        (sensors, sensor) = np.unique(plant*len(self.__hourly["mac"].cat.categories) + mac, return_inverse=True)
+        sensorIndex = pd.DataFrame({"plant": self.__hourly["plant"].cat.categories[sensors // len(self.__hourly["mac"].cat.categories)],
+                                    "mac": self.__hourly["mac"].cat.categories[sensors % len(self.__hourly["mac"].cat.categories)]})
+        values = np.full((len(sensors), max(stop - first, 0), len(params)), np.nan, dtype=np.float32)
+        for (i, param) in enumerate(params):
+            values[sensor, hour - first, i] = _decode_values(self.__hourly[param].to_numpy()[rows], _RESOLUTION[param])
+        time = _EPOCH + np.arange(first, max(stop, first), dtype=np.int64)
+        return HourlyGrid(sensorIndex, time, params, values)
+
+    def rolling_mean(self, wnds, aggFunc="none", aggSpan="1h"):
+        """ Computes the rolling means of the passed aggregation (by default the hourly data) for all plants in one pass
+        and keeps them in the cache of derived data as aggFunc "mean" and aggSpan `wnd`. Without calling this function,
+        the rolling means are computed on first use, per plant.
+
+        :param wnds: one window or a list of windows, e.g. ["24h", "48h"]
+        :type wnds: `str` or `list`"""
         if not isinstance(wnds, list):
             wnds = [wnds]
+        df = pd.concat([self.data(plant, aggFunc, aggSpan) for plant in self.list_of_plants])
         for wnd in wnds:
-            if wnd in self.df.aggSpan.unique():
-                logger.warning("aggSpan %s already exists, skipping.",wnd)
-            else:
-                for index, sub_df in df.groupby(['plant', 'mac']):
-                    sub_df = sub_df.reset_index(['plant', 'mac'],drop=True)
-                    sub_df=sub_df.rolling(wnd).mean()
-                    sub_df["plant"] = index[0]
-                    sub_df["mac"] = index[1]
-                    sub_df["aggFunc"] = "mean" 
-                    sub_df["aggSpan"] = wnd
-                    df_toappend=df_toappend.append(sub_df.reset_index())
-        self.df = self.df.append(df_toappend,sort=False)
-        self.__mem_squeeze(self.df)
-        self.df = self.df.sort_values('time', ascending=False)
-        self.df = self.df.reset_index(drop=True)
-        self.__make_min_max()
-        
+            rolling = self.__stage("rolling_mean", self.__rolling, df, wnd)
+            for (plant, sub) in rolling.groupby("plant", observed=True, sort=False):
+                self.__keep((wnd, "mean", plant), sub.reset_index(drop=True))
+        self.__persist()
+
+    @staticmethod
+    def __rolling(df, wnd):
+        """ Returns the rolling means per sensor of the passed data for the window `wnd`, as float32 like the hourly data."""
+        wide = pyHHCC.rolling_windows(df, [wnd])
+        params = [param for param in ["E", "L", "S", "T"] if param in df.columns]
+        wide = wide.rename(columns={param + "_" + wnd: param for param in params}).astype({param: np.float32 for param in params})
+        return pyHHCC.__layout(wide)
+
+    @staticmethod
+    def rolling_windows(df, wnds, params=("E", "L", "S", "T")):
+        """ Computes time based rolling means (as `pd.DataFrame.rolling(wnd).mean()` does) for all windows and
+        all sensors in one pass: the data are sorted by sensor and time once, the start of every window is found by a
+        binary search on these sorted times and the means are taken as differences of cumulated sums.
+
+        :param df: hourly data with the columns plant, mac, time and the parameters, e.g. from :attr:`pyHHCC.df`.
+        :type df: `pd.DataFrame`
+        :param wnds: the windows, each processed by `pd.to_timedelta`, e.g. ["24h", "48h"].
+        :type wnds: `list`
+        :param params: the parameters to average, defaults to all four.
+        :type params: `list`, optional
+        :returns: one row per row in `df`, sorted by plant, mac and time, with the columns plant, mac, time
+            and one column "<param>_<wnd>" per parameter and window."""
+        params = [param for param in params if param in df.columns]
+        plant = pd.Categorical(df["plant"])
+        mac = pd.Categorical(df["mac"])
+        time = df["time"].to_numpy()
+        order = np.lexsort((time, mac.codes, plant.codes))
+        out = df[["plant", "mac", "time"]].iloc[order].reset_index(drop=True)
+        if len(out) == 0:
+            for wnd in wnds:
+                for param in params:
+                    out[param + "_" + wnd] = np.zeros(0)
+            return out
+        sensor = plant.codes[order].astype(np.int64)*(len(mac.categories)+1) + mac.codes[order]
+        sensor = np.concatenate([[0], np.cumsum(sensor[1:] != sensor[:-1])])
+        seconds = time[order].astype("datetime64[s]").astype(np.int64)
+        seconds = seconds - seconds.min()
+        lengths = [int(pd.to_timedelta(wnd).total_seconds()) for wnd in wnds]
+        # one key for sensor and time, so that a window never reaches into the previous sensor:
+        key = sensor*(seconds.max() + max(lengths) + 1) + seconds
+        values = df[params].to_numpy(dtype=float)[order]
+        valid = ~np.isnan(values)
+        sums = np.zeros((len(out)+1, len(params)))
+        sums[1:] = np.cumsum(np.where(valid, values, 0), axis=0)
+        counts = np.zeros((len(out)+1, len(params)), dtype=np.int64)
+        counts[1:] = np.cumsum(valid, axis=0)
+        for (wnd, length) in zip(wnds, lengths):
+            start = np.searchsorted(key, key - length, side="right")
+            count = counts[1:] - counts[start]
+            with np.errstate(invalid="ignore"):
+                # 0/0 gives NaN for windows without any valid value
+                mean = (sums[1:] - sums[start])/count
+            for (i, param) in enumerate(params):
+                out[param + "_" + wnd] = mean[:, i]
+        return out
+
+    def update(self, filepath):
+        """ Merges a newer export into the loaded data, e.g. after the next sync of the FlowerCare app.
+        Per sensor, only the hours which are not yet known are added, under the plant the sensor is known by. The cached rolling means and daily aggregates
+        are only recomputed from the first new hour onwards, see :meth:`pyHHCC.__refresh`.
+        Afterwards, the merged data are written to the history of the dataset, the folder "pyHHCC.history" next to the exports,
+        which the constructor loads (see `history` of :class:`pyHHCC`). The cache of each export only holds the data of that export.
+        Hence, the history is kept beyond the storage limit of the sensors, as long as each new export is merged by this function.
+
+        :param filepath: full path + filename of the new export, including file extension
+        :type filepath: `str`
+        :returns: the number of new hourly data points."""
+        logger.info("updating from: %s", filepath)
+        frames = self.__stage("read", _read_compact, filepath, self.__stage)
+        added = self.__merge(frames["hourly"], frames["failed"])
+        if added == 0:
+            logger.info("no new data in: %s", filepath)
+            return 0
+        self.version += 1
+        self.__stage("consistency_check", lambda df: self.__consistency_check(), self.__hourly)
+        # the cache of the export must not get the merged data:
+        self.__store = self.__history
+        self.__persist(save=True)
+        logger.info("%d new data points from: %s", added, filepath)
+        return added
+
+    def __load_history(self):
+        """ Loads the history of the dataset, written by :meth:`pyHHCC.update`, and merges the loaded data into it, as :meth:`pyHHCC.update` does:
+        the hours of the history are kept, the hours which are only in the loaded export(s) are added.
+
+        :returns: `False`, if there is no valid history."""
+        frames = self.__history.load()
+        if frames is None:
+            return False
+        (hourly, failed) = (self.__hourly, self.__failed)
+        (self.__hourly, self.__failed) = (frames["hourly"], frames["failed"])
+        self.__index()
+        self.__store = self.__history
+        self.__restore(frames)
+        added = self.__merge(hourly, failed)
+        logger.info("loaded the history with %d data points, %d new ones from the export", len(self.__hourly) - added, added)
+        if added > 0:
+            self.__persist(save=True)
+        return True
+
+    def __merge(self, new, failed):
+        """ Adds the hours of the encoded hourly data `new` (see :func:`_encode`), which are not yet known per sensor, and the hours of the sensor failures `failed`.
+        The derived data and the min/max index are brought up to date, see :meth:`pyHHCC.update`.
+
+        :returns: the number of new hourly data points."""
+        # a sensor is known by the plant of the loaded data, the hours are compared per sensor as in :meth:`pyHHCC.__ingest`:
+        (new, failed) = (_known_plants(self.__hourly, new), _known_plants(self.__hourly, failed))
+        (self.__failed, failed) = _shared_categories([self.__failed, failed])
+        self.__failed = pd.concat([self.__failed, failed], ignore_index=True, sort=False).drop_duplicates(["mac", "hour"])
+        for kept in self.__health.values():
+            for plant in failed["plant"].unique():
+                kept.pop(plant, None)
+        (hourly, new) = _shared_categories([self.__hourly, new])
+        keys = ["mac", "hour"]
+        seen = new[keys].merge(hourly[keys].drop_duplicates(), how="left", indicator=True)["_merge"] == "both"
+        new = new[~seen.to_numpy()]
+        if new.empty:
+            return 0
+
+        self.__hourly = _concat_encoded([hourly, new])
+        self.__index()
+
+        # the min/max index of the hourly data only needs the new rows, the one of evicted derived data is outdated:
+        newExtrema = _decode(new).groupby("plant", observed=True)[["E", "L", "S", "T"]]
+        (newMins, newMaxs) = (newExtrema.min(), newExtrema.max())
+        for key in list(self.__extrema.keys()):
+            if key[2] not in newMins.index:
+                continue
+            if key[:2] == ("1h", "none"):
+                (mins, maxs) = self.__extrema[key]
+                self.__extrema[key] = (np.fmin(mins, newMins.loc[key[2]].to_numpy()), np.fmax(maxs, newMaxs.loc[key[2]].to_numpy()))
+            elif key not in self.__derived:
+                del self.__extrema[key]
+
+        # per plant, the derived data are recomputed from the first new hour onwards, the health rules are evaluated again:
+        cutoff = new.groupby("plant", observed=True)["hour"].min()
+        for kept in self.__health.values():
+            for plant in cutoff.index:
+                kept.pop(plant, None)
+        for key in self.__derived.keys():
+            if key[2] in cutoff.index and key in self.__derived:
+                self.__refresh(key, pd.Timestamp(_EPOCH + cutoff[key[2]]))
+        self.minMax = {}
+        return len(new)
+
+    def __refresh(self, key, cutoff):
+        """ Recomputes the cached derived data `key` from `cutoff` onwards and keeps them. Only the hourly data which are needed
+        for that are used: the length of the window before `cutoff` for rolling means, the whole period for the aggregates per calendar period.
+        The min/max index is updated from the recomputed rows, unless a replaced row held the min or max value."""
+        aggSpan, aggFunc, plant = key
+        if aggSpan in ["daily", "weekly", "monthly"]:
+            (start, bound) = (pd.Timestamp(t[0]) for t in self.__period(np.array([cutoff.to_datetime64()]), aggSpan))
+        else:
+            start = cutoff - pd.to_timedelta(aggSpan)
+            bound = cutoff
+        old = self.__derived.get(key)
+        tail = self.__derive(self.data(plant, start=start), aggFunc, aggSpan)[aggFunc, aggSpan]
+        cut = np.searchsorted(old["time"].to_numpy(), bound.to_datetime64(), side="left")
+        tail = tail.iloc[np.searchsorted(tail["time"].to_numpy(), bound.to_datetime64(), side="left"):]
+        df = pd.concat([old.iloc[:cut], tail], ignore_index=True)
+        df = df.astype({"plant": self.__hourly["plant"].dtype, "mac": self.__hourly["mac"].dtype})
+
+        (mins, maxs) = self.__extrema[key]
+        (replacedMins, replacedMaxs) = _extrema(old.iloc[cut:])
+        extrema = None
+        if not (np.any(replacedMins <= mins) or np.any(replacedMaxs >= maxs)):
+            (tailMins, tailMaxs) = _extrema(tail)
+            extrema = (np.fmin(mins, tailMins), np.fmax(maxs, tailMaxs))
+        self.__keep(key, df, extrema)
+
     def rename_plants(self, rules=None):
-        """ Renames the plants based on the passed dict.
+        """ Renames the plants based on the passed dict. The cache and the history (see :meth:`pyHHCC.update`) keep the names of the exports,
+        so the plants are renamed for this instance only.
 
         :param rules: a dict with the original and new names. If nothing is passed, the existing names are cropped after the first round bracket.
         :type rules: `dict`, optional"""
+        categories = self.__hourly["plant"].cat.categories
         if rules is None:
             ren = dict()
             for plant in self.list_of_plants:
                 num = plant.find("(")
                 ren.update({plant: plant[0:num-1]})
-            self.df["plant"].cat.rename_categories(ren, inplace=True)
+            self.__hourly["plant"] = self.__hourly["plant"].cat.rename_categories(ren)
         else:
-            self.df["plant"].cat.rename_categories(rules, inplace=True)
-        self.list_of_plants = self.df.plant.unique().tolist()
+            self.__hourly["plant"] = self.__hourly["plant"].cat.rename_categories(rules)
+        renamed = dict(zip(categories, self.__hourly["plant"].cat.categories))
+        names = {renamed[plant]: self.__names.get(plant, plant) for plant in categories}
+        self.__names = {name: original for (name, original) in names.items() if name != original}
+        self.__index()
+        self.__derived.clear()
+        self.__extrema = {(aggSpan, aggFunc, renamed[plant]): extrema for ((aggSpan, aggFunc, plant), extrema) in self.__extrema.items()}
+        self.__failed["plant"] = self.__failed["plant"].cat.rename_categories({old: new for (old, new) in renamed.items() if old in self.__failed["plant"].cat.categories})
+        self.__health = {}
+        self.version += 1
 
-    def plot_save(self,name, **kwargs):
+    def plot_save(self, name, fig=None, **kwargs):
         """ Stores the current figure.
         
+        :param fig: The figure to store, defaults to the current figure of pyplot.
+        :type fig: `matplotlib.figure.Figure`, optional
         :param store: `True` to store the plot. Defaults to `False`. 
         :type store: `bool`
         :param outputdir: The output directory for the plots, which can be generated. Defautls to "plots/"
@@ -247,11 +1842,45 @@ class pyHHCC:
         :type dpi: `int`, optional
         :param override_name: Overwrites the default naming with this name. 
         :type override_name: `str`, optional"""
-        if kwargs.get('store', False):
-            name = kwargs.get('override_name', name) 
-            outputdir = kwargs.get('outputdir', "plots/") 
-            dpi = kwargs.get('dpi', 300) 
-            plt.gcf().savefig(outputdir + name, dpi=dpi)
+        import matplotlib.pyplot as plt
+        _save_figure(plt.gcf() if fig is None else fig, name, **kwargs)
+
+    def __panel(self, plant, param, **kwargs):
+        """ Collects everything that is needed to draw one parameter of one plant (see :func:`_draw_panel`):
+        the times and values within the plotted timespan, the limits of the axes, the color and the label."""
+        aggFunc = kwargs.get('aggFunc', "none")
+        aggSpan = kwargs.get('aggSpan', "1h")
+
+        if kwargs.get('light_as_integral', False) & (param == 'L'):
+            aggFunc = "sum"
+            aggSpan = "daily"
+
+        time_delta = kwargs.get('time_delta', '90days')
+        startTime = (pd.to_datetime(dt.datetime.now().date()) - pd.to_timedelta(time_delta))+pd.to_timedelta("24h")
+        endTime = pd.to_datetime(dt.datetime.now().date())+pd.to_timedelta("24h")
+        df = self.data(plant, aggFunc, aggSpan, start=startTime)
+
+        ylim = None
+        if kwargs.get('ylims_global', "True"):
+            if (aggSpan, param, aggFunc, "amax") not in self.minMax:
+                self.__stage("make_min_max", self.__make_min_max, aggSpan, aggFunc)
+            ylim = (0, self.minMax[aggSpan, param, aggFunc, "amax"])
+        return {"time": df["time"].to_numpy(),
+                "values": df[param].to_numpy(),
+                "xlim": (startTime, endTime),
+                "ylim": ylim,
+                "color": self.param[param]['color'],
+                "label": self.param[param]["label" if not kwargs.get('label_short', False) else "label_short"]}
+
+    def __panels(self, plant, **kwargs):
+        """ The panels of :meth:`pyHHCC.plot_onePlant`, in the order E, S, L, T."""
+        return [self.__panel(plant, param, **kwargs) for param in ["E", "S", "L", "T"]]
+
+    def panel(self, plant, param, **kwargs):
+        """ The data of one parameter of one plant, as drawn by :meth:`pyHHCC.plot_onePlant_oneParam` with the same kwargs:
+        a dict with the times and values within the plotted timespan, the limits of the axes, the color and the label.
+        To draw the plots elsewhere, e.g. in another process, see :class:`Renderer`."""
+        return self.__stage("panel", self.__panel, plant, param, **kwargs)
 
     def plot_onePlant_oneParam(self, ax, plant, param, **kwargs):
         """ Plots dta from one plant and the passed parameter. 
@@ -272,6 +1901,9 @@ class pyHHCC:
         :param ylims_global: `True` to scale the y axis per parameter equally over all plants. `False` to scale each plot individually. Defaults to `True`.
         :type ylims_global: `bool`, optional
         :param smoothingWnd: optional, the window with for smoothing. Default for parameters E, S, T is 48h. L is not soothed by default. For individual adjustments, set `smoothingWnd_E`, `smoothingWnd_S`, `smoothingWnd_L` and/or `smoothingWnd_T`
+        :param downsample: `True` to draw at most 4 points per pixel column of the axis (the first, the last, the min and the max),
+            instead of every data point, see :func:`_envelope`. Speeds up long time spans, e.g. a year of hourly data, without visible changes. Defaults to `False`.
+        :type downsample: `bool`, optional
         :param alphaOriginal: optional, 0.3 by default to suplress the visibility of unsmoothed data.
         :param alphaSmoothed: optional, 1.0 by default to highlight the plot of smoothed data.
         :type alphaOriginal: `float`, optional
@@ -290,82 +1922,8 @@ class pyHHCC:
         :type hide_ticks: `bool`, optional
         :param time_labels: "month" to show month on the major ticks and days as minor ticks.
         :type time_labels: `str`, optional"""
-        df = self.df
-        aggFunc = kwargs.get('aggFunc', "none")
-        aggSpan = kwargs.get('aggSpan', "1h")
-
-        if kwargs.get('light_as_integral', False) & (param == 'L'):
-            aggFunc = "sum"
-        
-        alphaOriginal = kwargs.get('alphaOriginal', 1)
-        alphaSmoothed = kwargs.get('alphaSmoothed', 1)
-        time_delta = kwargs.get('time_delta', '90days')
-        startTime = (pd.to_datetime(dt.datetime.now().date()) - pd.to_timedelta(time_delta))+pd.to_timedelta("24h")
-        endTime = pd.to_datetime(dt.datetime.now().date())+pd.to_timedelta("24h")
-        cTime = startTime <= df["time"]
-        cPlant = df["plant"] == plant
-        cAggFunc = df["aggFunc"] == aggFunc
-        cAggSpan = df["aggSpan"] == aggSpan
-
-        df = df[cPlant&cTime&cAggFunc&cAggSpan][["time", param]]
-        df = df.set_index("time")
-
-        smoothingWnd = {"E": kwargs.get('smoothingWnd_E', 48 if kwargs.get('smoothingWnd', "default") == "default" else kwargs.get('smoothingWnd')),
-                        "S": kwargs.get('smoothingWnd_S', 48 if kwargs.get('smoothingWnd', "default") == "default" else kwargs.get('smoothingWnd')),
-                        "T": kwargs.get('smoothingWnd_T', 48 if kwargs.get('smoothingWnd', "default") == "default" else kwargs.get('smoothingWnd')),
-                        "L": kwargs.get('smoothingWnd_L', 1 if kwargs.get('smoothingWnd', "default") == "default" else kwargs.get('smoothingWnd'))}
-        ax.plot(df, color=self.param[param]['color'], alpha=alphaOriginal) #tmp.plot would not work, because sharex somehow messes things up and some data don't show on some graph. Very stragen, but this fixes it.
-#        if param == "E":
-#            df = df.rolling(smoothingWnd["E"], center=True).median()
-#        if param == "S":
-#            df = df.rolling(smoothingWnd["S"], center=True).mean()
-#        if param == "T":
-#            df = df.rolling(smoothingWnd["T"], center=True).mean()
-#        if param == "L":
-#            df = df.rolling(smoothingWnd["L"], center=True).mean()
-#        ax.plot(df, color=self.param[param]['color'], alpha=alphaSmoothed)
-
-        ax.set_xlim(startTime, endTime)
-        if kwargs.get('ylims_global', "True"):
-            ax.set_ylim(0, self.minMax[aggSpan, param, aggFunc, "amax"])
-
-        ax.set_xlabel("")
-        ax.set_ylabel(self.param[param]["label" if not kwargs.get('label_short', False) else "label_short"])
-
-        years = mdates.YearLocator()   # every year
-        months = mdates.MonthLocator()  # every month
-        days = mdates.DayLocator()  # every month
-        hours = mdates.HourLocator()  # every month
-        years_fmt = mdates.DateFormatter('%Y')
-        months_fmt = mdates.DateFormatter('%Y-%m')
-        days_fmt = mdates.DateFormatter('%Y-%m-%d')
-
-        time_labels = kwargs.get('time_labels', 'month')
-        if time_labels == "year":
-            ax.xaxis.set_major_locator(years)
-            ax.xaxis.set_major_formatter(years_fmt)
-            ax.xaxis.set_minor_locator(months)
-            ax.format_xdata = mdates.DateFormatter('%Y-%m-%d')
-        elif time_labels == "month":
-            ax.xaxis.set_major_locator(months)
-            ax.xaxis.set_major_formatter(months_fmt)
-            ax.xaxis.set_minor_locator(days)
-            ax.format_xdata = mdates.DateFormatter('%Y-%m-%d')
-        elif time_labels == "day":
-            ax.xaxis.set_major_locator(days)
-            ax.xaxis.set_major_formatter(days_fmt)
-            ax.xaxis.set_minor_locator(hours)
-            ax.format_xdata = mdates.DateFormatter('%Y-%m-%d')
-        else:
-            logger.error("unknown parameter for 'time_labels' ")
-        
-        if kwargs.get('hide_xTicks', False) | kwargs.get('hide_ticks', False):
-            ax.get_xaxis().set_ticks([])
-            ax.get_xaxis().set_ticklabels([])
-        if kwargs.get('hide_yTicks', False) | kwargs.get('hide_ticks', False):
-            ax.set_ylabel("")
-            ax.get_yaxis().set_ticks([])
-            ax.get_yaxis().set_ticklabels([])
+        panel = self.__stage("panel", self.__panel, plant, param, **kwargs)
+        self.__stage("draw", _draw_panel, ax, panel, **kwargs)
 
     def plot_onePlant(self, plant=None, **kwargs):
         """ Generates one plot of the four parameters light, temperature, nutrition and light over time. For further available settings, see :meth:`pyHHCC.plot_onePlant_oneParam` - but some might be defined along the call stack.
@@ -376,37 +1934,41 @@ class pyHHCC:
         :type store: `bool`, optional
         :param landscape: `True` to provide a 2x2 plot. `False` to plot the parameters in one row. Defaults to `True`.
         :type landscape: `bool`, optional"""        
+        import matplotlib.pyplot as plt
         if plant is None:
             plant = self.list_of_plants[0]
-        if kwargs.get('landscape', False):
-            fig = plt.figure(num=plant, figsize=[10, 3])
-            ax1 = fig.add_subplot(141)
-            ax2 = fig.add_subplot(142, sharex=ax1)
-            ax3 = fig.add_subplot(143, sharex=ax1)
-            ax4 = fig.add_subplot(144, sharex=ax1)
-        else:
-            fig = plt.figure(num=plant, figsize=[10, 6])
-            ax1 = fig.add_subplot(221)
-            ax2 = fig.add_subplot(222, sharex=ax1)
-            ax3 = fig.add_subplot(223, sharex=ax1)
-            ax4 = fig.add_subplot(224, sharex=ax1)
-        self.plot_onePlant_oneParam(ax1, plant, "E", **kwargs)
-        self.plot_onePlant_oneParam(ax2, plant, "S", **kwargs)
-        self.plot_onePlant_oneParam(ax3, plant, "L", **kwargs)
-        self.plot_onePlant_oneParam(ax4, plant, "T", **kwargs)
-        fig.autofmt_xdate()
-        fig.align_ylabels()
-        plt.tight_layout(rect=[0, 0.03, 1, 0.95])
-        fig.suptitle(plant, fontsize=14)
-        self.plot_save("Health of " + plant, **kwargs)
-
-    def plot_onePlant_batch(self, **kwargs):
+        fig = plt.figure(num=plant, figsize=_figsize(**kwargs))
+        panels = self.__stage("panel", self.__panels, plant, **kwargs)
+        self.__stage("draw", _draw_onePlant, fig, plant, panels, **kwargs)
+        self.__stage("save", self.plot_save, "Health of " + plant, fig=fig, **kwargs)
+
+    def plot_onePlant_batch(self, workers=1, **kwargs):
         """ Calls :meth:`pyHHCC.plot_onePlant` for all available plants. For further available settings, see :meth:`pyHHCC.plot_onePlant_oneParam` - but some might be defined along the call stack.
+
+        With more than one worker, the plots are rendered and stored in parallel by a pool of processes.
+        Each process only receives the data of its plant and draws them without pyplot, to the same files as the serial path.
         
+        :param workers: The number of processes to render the plots, `None` for one per CPU. Defaults to 1, to plot in this process.
+        :type workers: `int`, optional
         :param store: `True` to store the plot. Defaults to `False`. See :meth:`pyHHCC.plot_save` for further details.
         :type store: `bool`, optional"""
-        for plant in self.list_of_plants:
-            self.plot_onePlant(plant, **kwargs)
+        if workers != 1 and not kwargs.get('store', False):
+            logger.warning("plots rendered in parallel can only be stored, plotting serially since 'store' is not set")
+            workers = 1
+        if workers == 1:
+            for plant in self.list_of_plants:
+                self.plot_onePlant(plant, **kwargs)
+            return
+        jobs = [(plant, self.__stage("panel", self.__panels, plant, **kwargs)) for plant in self.list_of_plants]
+        self.__stage("render_parallel", pyHHCC.__render_parallel, jobs, workers, kwargs)
+
+    @staticmethod
+    def __render_parallel(jobs, workers, kwargs):
+        """ Renders and stores the plots of the (plant, panels) `jobs` in a pool of `workers` processes."""
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_render_onePlant, plant, panels, kwargs) for (plant, panels) in jobs]
+            for future in futures:
+                future.result()
 
     def plot_allPlants(self, **kwargs):
         """ Generates one comprehensive plot for all plants and the four parameters light, temperature, nutrition and light over time. For further available settings, see :meth:`pyHHCC.plot_onePlant_oneParam` - but some might be defined along the call stack.
@@ -415,30 +1977,29 @@ class pyHHCC:
         :type store: `bool`, optional
         :param landscape: `True` to plot the plants as colums and the params as columns. `False` to plot transposed. Defaults to `True`.
         :type landscape: `bool`, optional""" 
-        if kwargs.get('landscape', True):
-            fig, axs = plt.subplots(4, len(self.list_of_plants), sharex=True, figsize=(10, len(self.list_of_plants)))
-            for (i, plant) in enumerate(self.list_of_plants):
-                self.plot_onePlant_oneParam(axs[0, i], plant, "E", **kwargs, hide_ticks=bool(i), label_short=True)
-                self.plot_onePlant_oneParam(axs[1, i], plant, "S", **kwargs, hide_ticks=bool(i), label_short=True)
-                self.plot_onePlant_oneParam(axs[2, i], plant, "L", **kwargs, hide_ticks=bool(i), label_short=True)
-                self.plot_onePlant_oneParam(axs[3, i], plant, "T", **kwargs, hide_xTicks=False, hide_yTicks=bool(i), label_short=True)
-                axs[0, i].title.set_text(plant)
-            fig.autofmt_xdate()
-        else:
-            fig, axs = plt.subplots(len(self.list_of_plants), 4, sharex=True, figsize=(10, 2.5*len(self.list_of_plants)))
-            for (i, plant) in enumerate(self.list_of_plants):
-                self.plot_onePlant_oneParam(axs[i, 0], plant, "E", **kwargs, hide_yTicks=True)
-                self.plot_onePlant_oneParam(axs[i, 1], plant, "S", **kwargs, hide_yTicks=True)                
-                self.plot_onePlant_oneParam(axs[i, 2], plant, "L", **kwargs, hide_yTicks=True)                
-                self.plot_onePlant_oneParam(axs[i, 3], plant, "T", **kwargs, hide_yTicks=True)        
-                axs[i, 0].set_ylabel(plant)
-            axs[0, 0].title.set_text(self.param["E"]["label"])
-            axs[0, 1].title.set_text(self.param["S"]["label"])
-            axs[0, 2].title.set_text(self.param["L"]["label"])
-            axs[0, 3].title.set_text(self.param["T"]["label"])
-            fig.autofmt_xdate()
-        plt.tight_layout(rect=[0, 0, 1, 1])
-        plt.subplots_adjust(hspace=.001)
-        plt.subplots_adjust(wspace=.001)
-        
-        pyHHCC.plot_save("Overview", **kwargs)               
+        import matplotlib.pyplot as plt
+        fig = plt.figure(figsize=_overview_size(len(self.list_of_plants), **kwargs))
+        grid = _overview_axes(fig, self.list_of_plants, {param: self.param[param]["label"] for param in self.param}, **kwargs)
+        for (ax, plant, param, axKwargs) in grid:
+            self.plot_onePlant_oneParam(ax, plant, param, **axKwargs)
+        _finish_overview(fig, grid, **kwargs)
+
+        self.__stage("save", self.plot_save, "Overview", fig=fig, **kwargs)
+
+    def renderer(self, plant=None, blit=False, **kwargs):
+        """ Creates a persistent plot of :meth:`pyHHCC.plot_allPlants`, or of :meth:`pyHHCC.plot_onePlant` for one plant,
+        to re-render it after :meth:`pyHHCC.update` without building the figure again, e.g. for a dashboard::
+
+            overview = hc.renderer(store=True, dpi=100)
+            ...
+            hc.update(filepath)
+            overview.refresh()
+            overview.save()
+
+        :param plant: The plant to plot, defaults to `None` for all plants.
+        :type plant: `str`, optional
+        :param blit: `True` to only draw the lines on a refresh, as long as the limits of the axes do not change. Defaults to `False`.
+        :type blit: `bool`, optional
+        :returns: the :class:`Renderer`. For further available settings, see :meth:`pyHHCC.plot_onePlant_oneParam`."""
+        labels = {param: self.param[param]["label"] for param in self.param}
+        return Renderer(self.panel, self.list_of_plants, labels, plant=plant, blit=blit, **kwargs)
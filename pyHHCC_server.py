@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=line-too-long
+# pylint: disable=C0103 # snake
+""" A local HTTP server around a long-lived :class:`pyHHCC.pyHHCC` instance, which serves the plots and the data
+without loading and rendering them again on each call. Only the standard library is needed beyond pyHHCC.
+
+usage: python pyHHCC_server.py export.csv [--host 127.0.0.1] [--port 8080] [--workers 2] [--interval 60]
+
+The following requests are served (GET only, the parameters are passed as query string):
+
+* ``/plants``: the names of the plants and the version of the data, as JSON.
+* ``/plot/onePlant?plant=...``: the plot of :meth:`pyHHCC.plot_onePlant` as png.
+* ``/plot/allPlants``: the plot of :meth:`pyHHCC.plot_allPlants` as png.
+* ``/data?plant=...&param=E,T``: the data of :meth:`pyHHCC.data` as JSON, with one list per column.
+
+The plots accept the parameters in :data:`PLOT_PARAMS`, with `dpi` up to :data:`MAX_DPI`, the data `plant`, `param`, `aggFunc`, `aggSpan` and `time_delta`.
+The responses are cached, keyed by the request and the version of the data (see :attr:`pyHHCC.version`),
+and the plots are rendered by a pool of processes, so the server keeps responding while rendering.
+With `interval`, the export is checked for changes and merged by :meth:`pyHHCC.update`. """
+
+import argparse
+import asyncio
+import concurrent.futures
+import datetime as dt
+import io
+import json
+import logging
+import os.path
+from urllib.parse import urlsplit, parse_qs
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+from pyHHCC import pyHHCC, _LRUCache, _draw_onePlant, _draw_panel, _figsize, _finish_overview, _overview_axes, _overview_cells, _overview_size
+
+logger = logging.getLogger(__name__)
+
+#: The parameters of the plots, which can be passed by the query string, with their types.
+PLOT_PARAMS = {"aggFunc": str, "aggSpan": str, "time_delta": str, "time_labels": str, "dpi": int,
+               "light_as_integral": bool, "landscape": bool, "ylims_global": bool, "label_short": bool, "downsample": bool}
+#: The highest resolution of the plots, the size of the rendered image grows with its square.
+MAX_DPI = 300
+
+class HTTPError(Exception):
+    """ An error, which is answered with its HTTP `status` and message."""
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def _render(plant, plants, labels, panels, kwargs):
+    """ Draws the plot of one plant or, if `plant` is `None`, the overview of `plants` from the collected `panels`,
+    without pyplot, and returns it as png. Runs in the worker processes of :class:`Server`."""
+    if plant is None:
+        fig = Figure(figsize=_overview_size(len(plants), **kwargs))
+        grid = _overview_axes(fig, plants, labels, **kwargs)
+        for ((ax, _, _, axKwargs), panel) in zip(grid, panels):
+            _draw_panel(ax, panel, **axKwargs)
+        _finish_overview(fig, grid, **kwargs)
+    else:
+        fig = Figure(figsize=_figsize(**kwargs))
+        _draw_onePlant(fig, plant, panels, **kwargs)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=kwargs.get('dpi', 100))
+    return buffer.getvalue()
+
+class Server:
+    """ Serves the plots and the data of a :class:`pyHHCC.pyHHCC` instance by HTTP, see the module for the requests.
+    The data are accessed by one request at a time, in a thread, so the event loop keeps responding while they are derived.
+    The plots are drawn from the collected panels (see :meth:`pyHHCC.panel`) in a pool of `workers` processes. Concurrent equal requests are rendered once.
+
+    :param hc: The loaded data.
+    :type hc: `pyHHCC`
+    :param host: Defaults to "127.0.0.1", to only serve local requests.
+    :type host: `str`, optional
+    :param port: Defaults to 8080.
+    :type port: `int`, optional
+    :param workers: The number of processes to render the plots, `None` for one per CPU. Defaults to 1.
+    :type workers: `int`, optional
+    :param cacheSize: The memory limit in bytes for the cached responses, defaults to 64 MB.
+    :type cacheSize: `int`, optional
+    :param watch: The export to merge by :meth:`pyHHCC.update`, whenever it changed. Defaults to `None`.
+    :type watch: `str`, optional
+    :param interval: Seconds between two checks of `watch`. Defaults to 60.
+    :type interval: `float`, optional"""
+    def __init__(self, hc, host="127.0.0.1", port=8080, workers=1, cacheSize=64*2**20, watch=None, interval=60):
+        self.hc = hc
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.watch = watch
+        self.interval = interval
+        self.cache = _LRUCache(cacheSize)
+        self.__pending = {}
+        self.__lock = None
+        self.__pool = None
+
+    def run(self):
+        """ Serves until interrupted."""
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            pass
+
+    async def serve(self):
+        """ Serves until cancelled."""
+        self.__lock = asyncio.Lock()
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.workers) as self.__pool:
+            server = await asyncio.start_server(self.__handle, self.host, self.port)
+            logger.info("serving on http://%s:%d", self.host, self.port)
+            async with server:
+                if self.watch is not None:
+                    watcher = asyncio.create_task(self.__watch())
+                try:
+                    await server.serve_forever()
+                finally:
+                    if self.watch is not None:
+                        watcher.cancel()
+
+    async def __watch(self):
+        """ Merges the watched export, whenever its modification time changed. The requests wait for the update."""
+        mtime = os.path.getmtime(self.watch) if os.path.exists(self.watch) else None
+        while True:
+            await asyncio.sleep(self.interval)
+            if not os.path.exists(self.watch) or os.path.getmtime(self.watch) == mtime:
+                continue
+            mtime = os.path.getmtime(self.watch)
+            async with self.__lock:
+                try:
+                    await asyncio.get_running_loop().run_in_executor(None, self.hc.update, self.watch)
+                except Exception:
+                    logger.exception("updating from %s failed", self.watch)
+            self.cache.clear()
+
+    async def __handle(self, reader, writer):
+        """ Answers one request and closes the connection."""
+        try:
+            request = await reader.readline()
+            while (await reader.readline()).strip():
+                pass
+            (method, target, _) = request.decode("latin-1").split(" ", 2)
+            if method != "GET":
+                raise HTTPError(405, "only GET is supported")
+            (contentType, body) = await self.respond(target)
+            status = 200
+        except HTTPError as ex:
+            (status, contentType, body) = (ex.status, "text/plain", str(ex).encode())
+        except ValueError:
+            (status, contentType, body) = (400, "text/plain", b"malformed request")
+        except Exception:
+            logger.exception("answering the request failed")
+            (status, contentType, body) = (500, "text/plain", b"internal error")
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}[status]
+        writer.write(("HTTP/1.1 %d %s\r\nContent-Type: %s\r\nContent-Length: %d\r\nConnection: close\r\n\r\n"
+                      % (status, reason, contentType, len(body))).encode("latin-1") + body)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def respond(self, target):
+        """ The (content type, body) of the response to the request `target`, e.g. "/plot/onePlant?plant=Ficus", from the cache if possible."""
+        url = urlsplit(target)
+        query = {key: values[-1] for (key, values) in parse_qs(url.query).items()}
+        handlers = {"/plants": self.__plants, "/plot/onePlant": self.__plot, "/plot/allPlants": self.__plot, "/data": self.__data}
+        if url.path not in handlers:
+            raise HTTPError(404, "unknown path: %s" % url.path)
+        # the plots start at today, so they are cached per day:
+        key = (url.path, tuple(sorted(query.items())), self.hc.version, dt.date.today())
+        response = self.cache.get(key)
+        if response is not None:
+            return response
+        if key in self.__pending:
+            return await asyncio.shield(self.__pending[key])
+        self.__pending[key] = asyncio.ensure_future(handlers[url.path](url.path, query))
+        try:
+            response = await asyncio.shield(self.__pending[key])
+        finally:
+            del self.__pending[key]
+        if key[2] == self.hc.version:
+            self.cache.put(key, response, size=len(response[1]))
+        return response
+
+    def __plant(self, query, required=True):
+        """ The plant of the query."""
+        plant = query.get("plant")
+        if plant is None and required:
+            raise HTTPError(400, "the parameter 'plant' is missing")
+        if plant is not None and plant not in self.hc.list_of_plants:
+            raise HTTPError(404, "unknown plant: %s" % plant)
+        return plant
+
+    async def __plants(self, path, query):
+        return ("application/json", json.dumps({"plants": self.hc.list_of_plants, "version": self.hc.version}).encode())
+
+    async def __plot(self, path, query):
+        """ Collects the panels of the plot and renders it in the pool."""
+        kwargs = {"dpi": 100}
+        for (key, value) in query.items():
+            if key == "plant":
+                continue
+            if key not in PLOT_PARAMS:
+                raise HTTPError(400, "unknown parameter: %s" % key)
+            kwargs[key] = value.lower() in ["1", "true", "yes"] if PLOT_PARAMS[key] is bool else PLOT_PARAMS[key](value)
+        if not 1 <= kwargs["dpi"] <= MAX_DPI:
+            raise HTTPError(400, "dpi must be between 1 and %d" % MAX_DPI)
+        async with self.__lock:
+            (plant, plants, labels, panels) = await asyncio.get_running_loop().run_in_executor(None, self.__panels, path, query, kwargs)
+        body = await asyncio.get_running_loop().run_in_executor(self.__pool, _render, plant, plants, labels, panels, kwargs)
+        return ("image/png", body)
+
+    def __panels(self, path, query, kwargs):
+        """ The plant (`None` for the overview), the plants, the labels and the panels of the plot.
+        Runs in a thread under the lock, as it may derive the data of all plants."""
+        plants = self.hc.list_of_plants
+        labels = {param: self.hc.param[param]["label"] for param in self.hc.param}
+        if path == "/plot/onePlant":
+            plant = self.__plant(query)
+            return (plant, plants, labels, [self.hc.panel(plant, param, **kwargs) for param in ["E", "S", "L", "T"]])
+        return (None, plants, labels, [self.hc.panel(name, param, **axKwargs) for (_, _, name, param, axKwargs) in _overview_cells(plants, **kwargs)])
+
+    async def __data(self, path, query):
+        """ The data of one plant as JSON, with the times in ISO format and `null` for missing values."""
+        plant = self.__plant(query)
+        params = query.get("param", "E,L,S,T").split(",")
+        if not set(params) <= set(self.hc.param):
+            raise HTTPError(400, "unknown parameter: %s" % query["param"])
+        start = None
+        if "time_delta" in query:
+            start = pd.to_datetime(dt.datetime.now().date()) - pd.to_timedelta(query["time_delta"]) + pd.to_timedelta("24h")
+        async with self.__lock:
+            df = await asyncio.get_running_loop().run_in_executor(None, lambda: self.hc.data(plant, query.get("aggFunc", "none"), query.get("aggSpan", "1h"), start=start))
+        out = {"plant": plant, "version": self.hc.version,
+               "time": np.datetime_as_string(df["time"].to_numpy(), unit="s").tolist()}
+        for param in params:
+            values = df[param].to_numpy(dtype=np.float64)
+            out[param] = np.where(np.isnan(values), None, values.round(3)).tolist()
+        return ("application/json", json.dumps(out).encode())
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("filename", help="the export or the folder of exports, see pyHHCC")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=1, help="processes to render the plots")
+    parser.add_argument("--interval", type=float, default=60, help="seconds between the checks for a changed export, 0 to not check")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    hc = pyHHCC(args.filename)
+    watch = args.filename if args.interval > 0 and os.path.isfile(args.filename) else None
+    Server(hc, args.host, args.port, args.workers, watch=watch, interval=args.interval).run()
+
+if __name__ == '__main__':
+    main()
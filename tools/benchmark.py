@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+""" Benchmark suite of pyHHCC on a generated export (see synthetic_export.generate).
+
+Each benchmark is run `--repeat` times and the best time is reported and compared with the last recorded run
+of the same size in tools/benchmark_results.jsonl, so regressions show up over time. With `--record`, the results are
+appended to it together with the commit and the versions of python and pandas, otherwise the tree is left untouched.
+Afterwards, pyHHCC is imported and used for data only in a fresh interpreter, which must not import matplotlib
+and must take at most IMPORT_BUDGET seconds on top of numpy and pandas,
+the points per pixel column of the downsampled plots are checked to be bounded,
+the bytes per hourly sample are checked against MEMORY_BUDGET and compared with the long table,
+which pyHHCC held before the compact storage. If a check fails, the script exits with status 1, after the results are recorded if requested.
+
+usage: python tools/benchmark.py [--plants 20] [--days 365] [--missing 0.05] [--repeat 3] [--only load,daily] [--record] """
+import argparse
+import datetime as dt
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import timeit
+import warnings
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from pyHHCC import pyHHCC, _CacheStore
+from synthetic_export import generate, write_export
+
+RESULTS = os.path.join(os.path.dirname(__file__), "benchmark_results.jsonl")
+TOLERANCE = 1.2  # slower by more than 20% counts as regression
+MEMORY_BUDGET = 16  # bytes per hourly sample
+IMPORT_BUDGET = 0.2  # seconds to import pyHHCC, after numpy and pandas (matplotlib.pyplot alone takes about 0.5 s)
+
+
+def benchmarks(filepath):
+    """ Returns the benchmarks as a dict name: (setup, run). `setup` is called before each repetition and not timed,
+    its result is passed to `run`. The plots are stored next to `filepath`, so rendering is included. """
+    hc = pyHHCC(filepath)
+    plant = hc.list_of_plants[0]
+    wnds = ["24h", "48h", "72h"]
+    store = {"store": True, "outputdir": os.path.dirname(filepath) + os.sep, "dpi": 100}
+
+    def plot_oneParam(h):
+        h.plot_onePlant_oneParam(plt.figure().gca(), plant, "T")
+        h.plot_save("oneParam.png", **store)
+
+    def fresh():
+        """ The loaded data without any derived data, min/max index or min/max values. """
+        hc._pyHHCC__derived.clear()
+        hc._pyHHCC__extrema.clear()
+        hc.minMax = {}
+        plt.close("all")
+        return hc
+
+    def warm():
+        """ The loaded data with the derived data of the plots computed already. """
+        fresh()
+        hc.rolling_mean(["1h"], "none")
+        for aggFunc in ["none", "sum"]:
+            hc._pyHHCC__make_min_max("1h" if aggFunc == "none" else "daily", aggFunc)
+        plt.close("all")
+        return hc
+
+    return {
+        "load": (lambda: None, lambda _: pyHHCC(filepath, ignorePickled=True)),
+        "cache_save": (lambda: {"hourly": hc._pyHHCC__hourly, "failed": hc._pyHHCC__failed}, lambda frames: _CacheStore(filepath).save(**frames)),
+        "cache_load": (lambda: None, lambda _: _CacheStore(filepath).load()),
+        "init_cached": (lambda: None, lambda _: pyHHCC(filepath)),
+        "rolling_mean": (fresh, lambda h: h.rolling_mean(wnds)),
+        "aggregate_daily": (lambda: hc.df, lambda df: pyHHCC._pyHHCC__calendar(df, "daily")),
+        "make_min_max": (fresh, lambda h: h._pyHHCC__make_min_max("24h", "mean")),
+        "grid_rolling_daily": (lambda: hc, lambda h: (lambda g: (g.rolling_mean("48h"), g.daily("sum"), g.gaps()))(h.grid())),
+        "health": (fresh, lambda h: (h._pyHHCC__health.clear(), h.health())),
+        "series_batch": (lambda: hc, lambda h: h.series_batch(aggFunc="sum", aggSpan="daily", start=dt.date.today() - dt.timedelta(days=30))),
+        "plot_onePlant_oneParam": (warm, plot_oneParam),
+        "plot_onePlant": (warm, lambda h: h.plot_onePlant(plant, **store)),
+        "plot_onePlant_batch": (warm, lambda h: h.plot_onePlant_batch(**store)),
+        "plot_allPlants": (warm, lambda h: h.plot_allPlants(light_as_integral=True, **store)),
+        "plot_allPlants_downsample": (warm, lambda h: h.plot_allPlants(light_as_integral=True, downsample=True, **store)),
+        "renderer_refresh": (lambda: warm().renderer(light_as_integral=True, **store), lambda r: (r.refresh(), r.save())),
+        "renderer_refresh_blit": (lambda: warm().renderer(light_as_integral=True, blit=True, **store), lambda r: (r.refresh(), r.save())),
+    }
+
+
+def long_table(hc):
+    """ The long table, which pyHHCC held before the compact storage: the hourly data, the rolling means over 24, 48 and 72 hours
+    and the daily aggregates stacked, with the labels aggFunc and aggSpan per row and categoricals for plant, mac and the labels. """
+    frames = [hc.df.assign(aggFunc="none", aggSpan="1h")]
+    for plant in hc.list_of_plants:
+        for (aggFunc, aggSpan) in [("mean", "24h"), ("mean", "48h"), ("mean", "72h"), ("sum", "daily"), ("min", "daily"), ("max", "daily"), ("mean", "daily")]:
+            frames.append(hc.data(plant, aggFunc, aggSpan).assign(aggFunc=aggFunc, aggSpan=aggSpan))
+    df = pd.concat(frames, ignore_index=True)
+    return df.astype({"plant": "category", "mac": "category", "aggFunc": "category", "aggSpan": "category"})
+
+
+def memory(filepath):
+    """ Bytes per hourly sample of the compact storage, of :attr:`pyHHCC.df` and of the former long table. """
+    hc = pyHHCC(filepath)
+    samples = len(hc.df)
+    compact = hc.memory_usage().loc["hourly", "bytes"]/samples
+    decoded = hc.df.memory_usage(index=True, deep=True).sum()/samples
+    former = long_table(hc).memory_usage(index=True, deep=True).sum()/samples
+    return {"bytes_per_sample": compact, "df_bytes_per_sample": decoded, "long_table_bytes_per_sample": former}
+
+
+def imports(filepath):
+    """ The time to import pyHHCC in a fresh interpreter, in total and on top of numpy and pandas, and the matplotlib modules,
+    which are imported by the data-only use: loading `filepath`, the daily aggregates and the rolling means. """
+    code = ("import sys, time\n"
+            "sys.path.insert(0, %r)\n"
+            "start = time.perf_counter()\n"
+            "import numpy, pandas\n"
+            "libraries = time.perf_counter() - start\n"
+            "from pyHHCC import pyHHCC\n"
+            "seconds = time.perf_counter() - start\n"
+            "hc = pyHHCC(%r)\n"
+            "hc.data(hc.list_of_plants[0], 'sum', 'daily')\n"
+            "hc.rolling_mean(['24h'])\n"
+            "print(seconds, seconds - libraries, *sorted(m for m in sys.modules if m.split('.')[0] == 'matplotlib'))\n"
+            % (os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."), filepath))
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.split()
+    return (float(out[0]), float(out[1]), out[2:])
+
+
+def points(filepath):
+    """ The largest number of points drawn per pixel column of an axis by :meth:`pyHHCC.plot_allPlants` with `downsample`,
+    which must not exceed 4 (first, last, min and max). """
+    hc = pyHHCC(filepath)
+    hc.plot_allPlants(downsample=True, time_delta="%ddays" % (hc.df["time"].max() - hc.df["time"].min()).days)
+    fig = plt.gcf()
+    fig.canvas.draw()
+    worst = 0
+    for ax in fig.axes:
+        columns = ax.get_position().width * fig.get_figwidth() * fig.dpi
+        for line in ax.get_lines():
+            worst = max(worst, len(line.get_xdata())/columns)
+    plt.close("all")
+    return worst
+
+
+def measure(setup, run, repeat):
+    """ Best of `repeat` runs, in seconds. """
+    times = []
+    for _ in range(repeat):
+        arg = setup()
+        times.append(timeit.timeit(lambda: run(arg), number=1))
+    return min(times)
+
+
+def commit():
+    """ The current commit of the repository, if known. """
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def previous(size):
+    """ The last recorded results for the same size of the data. """
+    if not os.path.exists(RESULTS):
+        return {}
+    last = {}
+    with open(RESULTS) as fp:
+        for line in fp:
+            record = json.loads(line)
+            if record["size"] == size:
+                last = record["results"]
+    return last
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--plants", type=int, default=20)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--missing", type=float, default=0.05, help="fraction of missing values")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", default=None, help="comma separated names of the benchmarks to run")
+    parser.add_argument("--record", action="store_true", help="append the results to %s" % os.path.basename(RESULTS))
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    warnings.simplefilter("ignore", FutureWarning)
+
+    size = {"plants": args.plants, "days": args.days, "missing": args.missing}
+    last = previous(size)
+    results = {}
+    failed = []
+    with tempfile.TemporaryDirectory() as tmp:
+        filepath = os.path.join(tmp, "export.csv")
+        write_export(generate(args.plants, args.days, args.missing), filepath)
+        suite = benchmarks(filepath)
+        names = args.only.split(",") if args.only else list(suite)
+        print("%d plants x %d days, %.0f%% missing values" % (args.plants, args.days, 100*args.missing))
+        for name in names:
+            results[name] = measure(*suite[name], args.repeat)
+            line = "%-24s %9.4f s" % (name, results[name])
+            if name in last:
+                ratio = results[name]/last[name]
+                line += "   x%.2f of last run%s" % (ratio, "   REGRESSION" if ratio > TOLERANCE else "")
+            print(line)
+        if not args.only:
+            (results["import"], results["import_pyHHCC"], modules) = imports(filepath)
+            if modules:
+                failed.append("data-only use imports %d matplotlib modules" % len(modules))
+            if results["import_pyHHCC"] > IMPORT_BUDGET:
+                failed.append("import of pyHHCC over the budget of %.1f s" % IMPORT_BUDGET)
+            print("import of pyHHCC: %.3f s (%.3f s after numpy and pandas), matplotlib modules after data-only use: %d%s%s"
+                  % (results["import"], results["import_pyHHCC"], len(modules), "   IMPORTS MATPLOTLIB" if modules else "",
+                     "   OVER BUDGET of %.1f s" % IMPORT_BUDGET if results["import_pyHHCC"] > IMPORT_BUDGET else ""))
+            results["points_per_column"] = points(filepath)
+            if results["points_per_column"] > 4:
+                failed.append("more than 4 points per pixel column in the downsampled plots")
+            print("downsampled plots: at most %.2f points per pixel column%s"
+                  % (results["points_per_column"], "   UNBOUNDED" if results["points_per_column"] > 4 else ""))
+            results.update(memory(filepath))
+            if results["bytes_per_sample"] > MEMORY_BUDGET:
+                failed.append("memory per hourly sample over the budget of %d bytes" % MEMORY_BUDGET)
+            print("memory per hourly sample: %.1f bytes (df: %.1f bytes, former long table: %.1f bytes, %.1fx)%s"
+                  % (results["bytes_per_sample"], results["df_bytes_per_sample"], results["long_table_bytes_per_sample"],
+                     results["long_table_bytes_per_sample"]/results["bytes_per_sample"],
+                     "   OVER BUDGET of %d bytes" % MEMORY_BUDGET if results["bytes_per_sample"] > MEMORY_BUDGET else ""))
+
+    if args.record:
+        record = {"date": dt.datetime.now().isoformat(timespec="seconds"),
+                  "commit": commit(),
+                  "python": platform.python_version(),
+                  "pandas": pd.__version__,
+                  "size": size,
+                  "results": results}
+        with open(RESULTS, "a") as fp:
+            fp.write(json.dumps(record) + "\n")
+    if failed:
+        sys.exit("failed: " + "; ".join(failed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+""" Times the parser of pyHHCC on the bundled example data, scaled up synthetically.
+
+usage: python tools/benchmark_load.py [sensors] [repeats] """
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from pyHHCC import pyHHCC
+from synthetic_export import load_example, scale, write_export
+
+sensors = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+with tempfile.TemporaryDirectory() as tmp:
+    filepath = os.path.join(tmp, "export.csv")
+    write_export(scale(load_example(), sensors, repeats), filepath)
+    runs = timeit.repeat(lambda: pyHHCC.read(filepath), number=1, repeat=3)
+    print("%d sensors, %d rows: best of 3: %.3f s" % (sensors, len(pyHHCC.read(filepath)), min(runs)))
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+""" Times pyHHCC.rolling_windows against a loop over the sensors with pandas' rolling, the way pyHHCC used to do it.
+
+usage: python tools/benchmark_rolling.py [plants] [days] """
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from pyHHCC import pyHHCC
+
+plants = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+days = int(sys.argv[2]) if len(sys.argv) > 2 else 365
+wnds = ["1h", "24h", "48h", "72h"]
+
+rng = np.random.default_rng(0)
+time = pd.date_range("2019-01-01", periods=days*24, freq="1h")
+df = pd.DataFrame({"time": np.tile(time, plants),
+                   "plant": np.repeat(["plant %d" % i for i in range(plants)], len(time)),
+                   "mac": np.repeat(["C4:7C:8D:6A:%02X:%02X" % (i//256, i % 256) for i in range(plants)], len(time))})
+for param in ["E", "L", "S", "T"]:
+    df[param] = rng.random(len(df)).astype("float32")*100
+# missing hours:
+df = df[rng.random(len(df)) > 0.05].reset_index(drop=True)
+
+
+def per_sensor_loop():
+    out = []
+    for wnd in wnds:
+        for (_, sub_df) in df.set_index("time").groupby(["plant", "mac"]):
+            out.append(sub_df[["E", "L", "S", "T"]].rolling(wnd).mean())
+    return out
+
+
+loop = min(timeit.repeat(per_sensor_loop, number=1, repeat=3))
+engine = min(timeit.repeat(lambda: pyHHCC.rolling_windows(df, wnds), number=1, repeat=3))
+print("%d plants x %d days x %d windows (%d rows)" % (plants, days, len(wnds), len(df)))
+print("loop over sensors: %.3f s" % loop)
+print("rolling_windows:   %.3f s" % engine)
+
+wide = pyHHCC.rolling_windows(df, wnds)
+reference = pd.concat(per_sensor_loop()[-plants:])
+print("max. abs. deviation (72h): %.2e" % np.nanmax(np.abs(wide[["E_72h", "L_72h", "S_72h", "T_72h"]].to_numpy() - reference.to_numpy())))
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+""" Checks that the cache keeps the min/max index and the derived data: a second instance of the same export computes neither
+the rolling means nor the daily aggregates again for the global min and max values and returns the same data as a fresh computation.
+A new aggregation only writes its own derived data to the cache, the cached ones of the other aggregations are kept.
+Fails with an AssertionError on the first difference.
+
+usage: python tools/check_cache.py """
+import json
+import logging
+import os
+import sys
+import tempfile
+
+import numpy as np
+from pandas.testing import assert_frame_equal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from pyHHCC import pyHHCC
+from synthetic_export import generate, write_export
+
+AGGREGATIONS = [("48h", "mean"), ("daily", "sum"), ("daily", "max"), ("1h", "none")]
+
+
+def min_max(hc):
+    """ The global min and max values of :data:`AGGREGATIONS`, as :meth:`pyHHCC.plot_allPlants` needs them with `ylims_global`. """
+    for (aggSpan, aggFunc) in AGGREGATIONS:
+        hc._pyHHCC__make_min_max(aggSpan, aggFunc)
+    return hc.minMax
+
+
+def main():
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        filepath = os.path.join(tmp, "export.csv")
+        write_export(generate(5, 60, missing=0.05), filepath)
+        first = pyHHCC(filepath)
+        first.rolling_mean(["48h"])
+        expected = dict(min_max(first))
+
+        second = pyHHCC(filepath, instrument=True)
+        found = min_max(second)
+        computed = set(second.stage_report()["stage"]) & {"derive", "rolling_mean"}
+        assert not computed, "computed again: %s" % computed
+        assert found.keys() == expected.keys() and all(np.isclose(found[key], expected[key]) for key in expected)
+        print("second instance: global min and max values from the cache, %d entries identical" % len(found))
+
+        second.rolling_mean(["72h"])
+        with open(os.path.join(filepath + ".cache", "meta.json")) as fp:
+            meta = json.load(fp)
+        written = sorted(name for (name, info) in meta["frames"].items() if name.startswith("derived") and name != "derived"
+                         and info["columns"][0][1]["file"].startswith("%s.%d." % (name, meta["generation"])))
+        assert len(written) == 1, "written again: %s" % written
+        print("new aggregation: %d of %d aggregations written to the cache" % (len(written), len(meta["frames"]) - 2))
+
+        fresh = pyHHCC(filepath, ignorePickled=True)
+        for plant in fresh.list_of_plants:
+            for (aggSpan, aggFunc) in AGGREGATIONS:
+                assert_frame_equal(second.data(plant, aggFunc, aggSpan), fresh.data(plant, aggFunc, aggSpan))
+        print("second instance: derived data of %d plants identical to a fresh computation" % len(fresh.list_of_plants))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+""" Checks that merged exports keep their values, when a parameter is encoded differently in each of them:
+as int16 steps of the sensor resolution in one and as float32 in the other, because one of its values is off the resolution
+(see pyHHCC._encode). Both ways of merging are checked, :meth:`pyHHCC.update` and a list of files, in both orders,
+without the history of :meth:`pyHHCC.update`, which would carry the data over from one check to the next.
+Fails with an AssertionError on the first difference.
+
+usage: python tools/check_encoding.py """
+import logging
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from pyHHCC import pyHHCC
+from synthetic_export import generate, write_export
+
+
+def expected(filepaths, keep):
+    """ The hourly data of the exports, read one by one and merged: for hours in both files, :meth:`pyHHCC.update` keeps
+    the known values (`keep` "first"), a list of files the ones of the most recent file (`keep` "last"). """
+    df = pd.concat([pyHHCC.read(filepath) for filepath in filepaths], ignore_index=True)
+    df = df.drop_duplicates(["mac", "time"], keep=keep).sort_values(["plant", "time"], kind="mergesort")
+    return df[["time", "E", "L", "S", "T"]].reset_index(drop=True).astype({param: np.float32 for param in "ELST"})
+
+
+def check(hc, filepaths, keep, name):
+    """ Compares the hourly data of `hc` with the exports, see :func:`expected`. """
+    df = hc.df[["time", "E", "L", "S", "T"]]
+    assert_frame_equal(df, expected(filepaths, keep), check_names=False)
+    print("%-44s %6d rows, max T %.2f: identical" % (name, len(df), df["T"].max()))
+
+
+def main():
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        onResolution = os.path.join(tmp, "onResolution.csv")
+        offResolution = os.path.join(tmp, "offResolution.csv")
+        write_export(generate(2, 20, end="2026-10-01"), onResolution)
+        df = generate(2, 20, end="2026-10-11", seed=1)
+        df.loc[df.index[-1], "T"] = 21.25
+        write_export(df, offResolution)
+
+        for filepaths in [[onResolution, offResolution], [offResolution, onResolution]]:
+            names = " + ".join(os.path.basename(filepath)[:-4] for filepath in filepaths)
+            hc = pyHHCC(filepaths[0], ignorePickled=True, history=False)
+            hc.update(filepaths[1])
+            check(hc, filepaths, "first", "update: " + names)
+            check(pyHHCC(filepaths, ignorePickled=True, history=False), filepaths, "last", "list of files: " + names)
+
+
+if __name__ == '__main__':
+    main()
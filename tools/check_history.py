@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+""" Checks the history of :meth:`pyHHCC.update`: an export, merged into the data of an older one, is kept in the history of the dataset,
+which the next instance loads, while the cache of each export keeps the data of that export only.
+The history is also updated while its files are memory mapped and cannot be removed, as on Windows,
+and after renaming the plants, which the new hours must keep, while the history keeps the names of the exports.
+Fails with an AssertionError on the first difference.
+
+usage: python tools/check_history.py """
+import logging
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from pyHHCC import pyHHCC, _CacheStore, _decode
+from synthetic_export import generate, write_export
+
+
+def merged(filepaths):
+    """ The hourly data of the exports, read one by one and merged as :meth:`pyHHCC.update` does, the known hours are kept. """
+    df = pd.concat([pyHHCC.read(filepath) for filepath in filepaths], ignore_index=True)
+    df = df.drop_duplicates(["mac", "time"], keep="first").sort_values(["plant", "time"], kind="mergesort")
+    return df[["time", "E", "L", "S", "T"]].reset_index(drop=True).astype({param: np.float32 for param in "ELST"})
+
+
+def check(df, expected, name):
+    """ Compares the hourly data `df` with the `expected` ones. """
+    assert_frame_equal(df[["time", "E", "L", "S", "T"]].reset_index(drop=True), expected, check_names=False)
+    print("%-44s %6d rows: identical" % (name, len(df)))
+
+
+def locked(path, **kwargs):
+    """ `os.remove` and `os.unlink` as on Windows for memory mapped files. """
+    raise PermissionError("the file is memory mapped: %s" % path)
+
+
+def main():
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        (older, newer) = (os.path.join(tmp, "older.csv"), os.path.join(tmp, "newer.csv"))
+        write_export(generate(2, 40, end="2026-09-01"), older)
+        write_export(generate(2, 30, end="2026-09-21", seed=1), newer)
+
+        pyHHCC(newer, history=False)
+        hc = pyHHCC(older)
+        assert hc.update(newer) > 0
+        check(hc.df, merged([older, newer]), "update")
+        for filepath in [older, newer]:
+            check(_decode(_CacheStore(filepath).load()["hourly"]), merged([filepath]), "cache of " + os.path.basename(filepath))
+        check(pyHHCC(newer).df, merged([older, newer]), "next instance, with history")
+        check(pyHHCC(newer, ignorePickled=True).df, merged([older, newer]), "next instance, reparsed, with history")
+        check(pyHHCC(newer, history=False).df, merged([newer]), "next instance, without history")
+        check(pyHHCC(tmp + os.sep).df, merged([older, newer]), "directory, with history")
+
+        latest = os.path.join(tmp, "latest.csv")
+        write_export(generate(2, 30, end="2026-10-11", seed=2), latest)
+        (remove, unlink, os.remove, os.unlink) = (os.remove, os.unlink, locked, locked)
+        try:
+            hc = pyHHCC(newer)
+            assert hc.update(latest) > 0
+        finally:
+            (os.remove, os.unlink) = (remove, unlink)
+        check(pyHHCC(latest).df, merged([older, newer, latest]), "update of the mapped history")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        (older, newer) = (os.path.join(tmp, "older.csv"), os.path.join(tmp, "newer.csv"))
+        write_export(generate(2, 40, end="2026-09-01"), older)
+        write_export(generate(2, 30, end="2026-09-21", seed=1), newer)
+        hc = pyHHCC(older)
+        names = {plant: name for (plant, name) in zip(hc.list_of_plants, ["Avocado", "Ficus"])}
+        hc.rename_plants(names)
+        assert hc.update(newer) > 0
+        assert hc.list_of_plants == sorted(names.values()), hc.list_of_plants
+        assert not hc.df.duplicated(["mac", "time"]).any()
+        check(hc.df, merged([older, newer]), "update after renaming the plants")
+        next = pyHHCC(newer)
+        assert next.list_of_plants == sorted(names), next.list_of_plants
+        check(next.df, merged([older, newer]), "next instance, with the names of the exports")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+""" Checks that the parser of pyHHCC returns the same raw data as the loader it replaced (`pyHHCC.__load` of the baseline),
+on synthetic exports from the bundled example data and generated ones, with and without missing values.
+Fails with an AssertionError on the first difference.
+
+usage: python tools/check_parser.py """
+import os
+import sys
+import tempfile
+import warnings
+
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from pyHHCC import pyHHCC
+from synthetic_export import generate, load_example, scale, write_export
+
+
+def baseline_load(filepath):
+    """ The former `pyHHCC.__load`, one dataframe per hour row, with `DataFrame.append` (removed in pandas 2) replaced
+    by collecting the frames and concatenating them at the end, which gives the same result. """
+    frames = []
+    with open(filepath, encoding='utf16') as fp:
+        line = fp.readline()
+        while line:
+            if (line.find("Flower Care")) >= 0:
+                mac = line[13:-2]
+                raw_dates = fp.readline()
+                dates = raw_dates.split("\t")
+                dates = list(filter(None, dates))
+                name = dates.pop(0)
+                raw_params = fp.readline()
+                params = raw_params.split("\t")
+                params = params[1:-1]
+                dates = [dates[(i)//4] for i in range((len(dates)-1)*4)]
+                for _ in range(24):
+                    raw_line = fp.readline()
+                    value_line = raw_line.split("\t")
+                    value_line = value_line[0:-1]
+                    hour = value_line.pop(0)
+                    hour = hour[1:-1]
+                    df_loop = pd.DataFrame([dates, params, value_line], index=['date', 'parameter', 'value']).T
+                    if hour == "24:00":
+                        df_loop['hour'] = "00:00"
+                        df_loop['time'] = pd.to_datetime(df_loop["date"]+" "+df_loop["hour"])
+                        df_loop['time'] = df_loop['time']+ pd.DateOffset(days=1)
+                    else:
+                        df_loop['hour'] = hour
+                        df_loop['time'] = pd.to_datetime(df_loop["date"]+" "+df_loop["hour"])
+                    df_loop = df_loop.drop(['date', 'hour'], axis=1)
+                    df_loop['value'] = pd.to_numeric(df_loop['value'], errors='coerce')
+                    df_loop = df_loop[np.isnan(df_loop['value']) == False]
+                    df_loop = df_loop.pivot(values="value", index="time", columns="parameter")
+                    df_loop = df_loop.reset_index()
+                    df_loop['plant'] = name
+                    df_loop['mac'] = mac
+                    frames.append(df_loop)
+            line = fp.readline()
+    df = pd.concat(frames, ignore_index=True)
+    df['mac'] = pd.Categorical(df.mac)
+    df['plant'] = pd.Categorical(df.plant)
+    for param in ["T", "E", "L", "S"]:
+        df[param] = pd.to_numeric(df[param], downcast='float')
+    return df
+
+
+def check(df, name):
+    """ Writes `df` as export and compares the parsed raw data with the ones of :func:`baseline_load`. """
+    with tempfile.TemporaryDirectory() as tmp:
+        filepath = os.path.join(tmp, "export.csv")
+        write_export(df, filepath)
+        expected = baseline_load(filepath)
+        parsed = pyHHCC._pyHHCC__parse(filepath)
+        assert_frame_equal(parsed, expected)
+    print("%-32s %7d rows: identical" % (name, len(parsed)))
+
+
+def main():
+    warnings.simplefilter("ignore", FutureWarning)
+    check(scale(load_example(), 2), "example, 2 sensors")
+    check(generate(3, 20), "generated, 3 sensors")
+    check(generate(3, 20, missing=0.2), "generated, 20% missing values")
+
+
+if __name__ == '__main__':
+    main()
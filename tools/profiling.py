@@ -1,15 +1,31 @@
+""" Profiles loading and plotting of pyHHCC with cProfile, on a generated export (see synthetic_export.generate).
+The profiles are written to pyHHCC.*.cprof, e.g. to be viewed with snakeviz.
+
+usage: python tools/profiling.py [plants] [days] """
 import cProfile
+import os
+import sys
+import tempfile
 
-import HHCC
 import matplotlib.pyplot as plt
 
-profRunInit=cProfile.run(
-        "hc=HHCC.HHCC('raw/')",
-        "HHCC.init.cprof")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from pyHHCC import pyHHCC
+from synthetic_export import generate, write_export
+
+plants = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+days = int(sys.argv[2]) if len(sys.argv) > 2 else 365
+
+with tempfile.TemporaryDirectory() as tmp:
+    filepath = os.path.join(tmp, "export.csv")
+    write_export(generate(plants, days, missing=0.05), filepath)
+    profRunInit=cProfile.run(
+            "hc=pyHHCC(filepath, ignorePickled=True)",
+            "pyHHCC.init.cprof")
 profRunPlot=cProfile.run(
         "hc.plot_onePlant()",
-        'HHCC.plotPlant.cprof')
+        'pyHHCC.plotPlant.cprof')
 profRunPlot=cProfile.run(
         "hc.plot_onePlant_oneParam(plt.gca(),hc.list_of_plants[0],'T')",
-        'HHCC.plot_onePlant_oneParam.cprof')
+        'pyHHCC.plot_onePlant_oneParam.cprof')
 #--> snakeviz
\ No newline at end of file
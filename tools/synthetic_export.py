@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+""" Writes synthetic exports in the UTF-16 format of the FlowerCare app, based on the bundled example data or generated from scratch. """
+
+import os
+import numpy as np
+import pandas as pd
+
+
+def load_example(path=os.path.join(os.path.dirname(__file__), "..", "examples", "example.pkl")):
+    """ Returns the hourly raw data of the bundled example in the units of the export (not converted). """
+    df = pd.read_pickle(path)
+    df = df[(df["aggFunc"] == "none") & (df["aggSpan"] == "1h")]
+    df = df[["time", "E", "L", "S", "T", "plant", "mac"]].copy()
+    df["E"] = (df["E"].astype(float)*1000).round()
+    df["L"] = (df["L"].astype(float)*1000).round()
+    df["plant"] = df["plant"].astype(str)
+    df["mac"] = df["mac"].astype(str)
+    return df.sort_values("time").reset_index(drop=True)
+
+
+def scale(df, sensors=1, repeats=1):
+    """ Scales the passed data up: every sensor is cloned `sensors` times (new name and mac)
+    and the time series is repeated `repeats` times back in time. """
+    span = df["time"].max() - df["time"].min() + pd.to_timedelta("1h")
+    span = pd.to_timedelta(span.ceil("1D"))
+    frames = []
+    for i in range(sensors):
+        for j in range(repeats):
+            sub = df.copy()
+            sub["time"] = sub["time"] - j*span
+            sub["plant"] = sub["plant"] + " (%d)" % i
+            sub["mac"] = "C4:7C:8D:%02X:%02X:%02X" % (i//65536 % 256, i//256 % 256, i % 256)
+            frames.append(sub)
+    return pd.concat(frames, ignore_index=True)
+
+
+def generate(plants=10, days=90, missing=0.0, end=None, seed=0):
+    """ Generates realistic hourly data for `plants` sensors over `days` days, ending at `end` (defaults to today, midnight),
+    in the units of the export: a daily cycle of temperature and light with changing weather, the soil humidity drying out
+    between irregular waterings and the nutrition following the humidity. A fraction `missing` of the values is dropped at random. """
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp.now().normalize() if end is None else pd.Timestamp(end)
+    time = pd.date_range(end=end, periods=days*24, freq="1h")
+    hour = time.hour.to_numpy()
+    day = np.asarray((time - time[0].normalize()).days)
+    frames = []
+    for i in range(plants):
+        weather = rng.uniform(0.3, 1, days+1)[day]
+        warm = rng.normal(0, 2, days+1)[day]
+        T = 21 + rng.normal(0, 1) + warm + 3*weather*np.sin(2*np.pi*(hour-9)/24) + rng.normal(0, 0.3, len(time))
+        L = rng.uniform(500, 3000)*weather*np.clip(np.sin(np.pi*(hour-6)/14), 0, None)**2
+        # waterings every 4 to 10 days, after which the soil dries out exponentially:
+        watered = np.cumsum(rng.integers(4, 11, days))*24
+        since = np.arange(len(time)) - watered[np.maximum(np.searchsorted(watered, np.arange(len(time)), "right") - 1, 0)]
+        since = np.where(np.arange(len(time)) < watered[0], np.arange(len(time)) + 24*rng.integers(0, 4), since)
+        S = 15 + rng.uniform(40, 60)*np.exp(-since/(24*rng.uniform(3, 6))) + rng.normal(0, 0.5, len(time))
+        E = S*rng.uniform(5, 12) + rng.normal(0, 10, len(time))
+        sub = pd.DataFrame({"time": time,
+                            "E": np.clip(np.round(E), 0, None),
+                            "L": np.round(L),
+                            "S": np.clip(np.round(S), 0, 100),
+                            "T": np.round(T, 1)})
+        for param in ["E", "L", "S", "T"]:
+            sub.loc[rng.random(len(sub)) < missing, param] = np.nan
+        sub["plant"] = "plant %d" % i
+        sub["mac"] = "C4:7C:8D:%02X:%02X:%02X" % (i//65536 % 256, i//256 % 256, i % 256)
+        frames.append(sub)
+    return pd.concat(frames, ignore_index=True)
+
+
+def write_export(df, filepath, params=("E", "L", "S", "T")):
+    """ Writes the hourly data `df` (columns time, plant, mac and the params) as an export of the FlowerCare app.
+
+    Each sensor is written as one block: a "Flower Care (<mac>)" line, one line with the plant name and the dates,
+    one line with the parameter names and 24 lines with the values for the hours "01:00" till "24:00". """
+    with open(filepath, "w", encoding="utf16") as fp:
+        for (plant, mac), sub in df.groupby(["plant", "mac"], sort=False):
+            # "24:00" belongs to the previous day:
+            shifted = sub["time"] - pd.to_timedelta("1h")
+            date = shifted.dt.strftime("%Y-%m-%d").to_numpy()
+            hour = (shifted.dt.hour + 1).to_numpy()
+            dates = np.unique(date)
+            col = np.searchsorted(dates, date)
+            table = np.full((24, len(dates)*len(params)), "", dtype=object)
+            for (k, param) in enumerate(params):
+                values = sub[param].to_numpy()
+                ok = ~np.isnan(values)
+                text = np.array(["%g" % v for v in values[ok]], dtype=object)
+                table[hour[ok]-1, col[ok]*len(params)+k] = text
+            fp.write("Flower Care (%s)\n" % mac)
+            fp.write(plant + "\t" + "".join(d + "\t"*len(params) for d in dates) + "\n")
+            fp.write("\t" + "\t".join(list(params)*len(dates)) + "\t\n")
+            for h in range(24):
+                fp.write('"%02d:00"\t' % (h+1) + "\t".join(table[h]) + "\t\n")
+            fp.write("\n")
+
+
+if __name__ == '__main__':
+    import sys
+    sensors = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    write_export(scale(load_example(), sensors, repeats), "examples/synthetic.csv")